@@ -1,11 +1,42 @@
 """Advanced static analysis engines. Additive only; no coupling to PEP 8 or PYBP."""
 from __future__ import annotations
 
-from app.analysis.types import run_types
-from app.analysis.dataflow import run_dataflow
-from app.analysis.errors import run_errors
-from app.analysis.security import run_security
-from app.analysis.metrics import run_metrics
+import ast
+from typing import Dict, Iterable, List, Optional
+
+from app.analysis._pipeline import run_pipeline
+from app.analysis.types import TypeRules, run_types
+from app.analysis.dataflow import DataflowRules, run_dataflow
+from app.analysis.errors import ErrorRules, run_errors
+from app.analysis.security import SecurityRules, run_security
+from app.analysis.metrics import MetricsRules, run_metrics
 from app.analysis.insights import run_insights
+from app.schemas import StaticAnalysisFinding
+
+# Rule sets in domain authority order (the order findings are reported in).
+RULE_SETS = (TypeRules, DataflowRules, ErrorRules, SecurityRules, MetricsRules)
+
+
+def run_all(
+    source: str, domains: Optional[Iterable[str]] = None, tree: Optional[ast.Module] = None
+) -> Dict[str, List[StaticAnalysisFinding]]:
+    """
+    Run the requested engines (all when domains is None) with one validation, one parse and one walk.
+    Returns findings keyed by domain, in RULE_SETS order; empty or invalid source yields empty lists.
+    Pass tree (the parsed source) to reuse a parse made elsewhere.
+    """
+    wanted = None if domains is None else set(domains)
+    return run_pipeline(source, [rs for rs in RULE_SETS if wanted is None or rs.domain in wanted], tree)
+
 
-__all__ = ["run_types", "run_dataflow", "run_errors", "run_security", "run_metrics", "run_insights"]
+__all__ = [
+    "RULE_SETS",
+    "run_all",
+    "run_pipeline",
+    "run_types",
+    "run_dataflow",
+    "run_errors",
+    "run_security",
+    "run_metrics",
+    "run_insights",
+]
@@ -0,0 +1,16 @@
+"""Shared finding dedupe. One finding per (rule_id, line); first seen wins; ordered by line, then rule."""
+from __future__ import annotations
+
+from typing import Dict, Iterable, List, Tuple
+
+from app.schemas import RawFinding
+
+
+def dedupe(findings: Iterable[RawFinding]) -> List[RawFinding]:
+    """Drop repeated (rule_id, line) findings in one pass, then sort once by (line, rule_id)."""
+    seen: Dict[Tuple[str, int], RawFinding] = {}
+    for f in findings:
+        key = (f.rule_id, f.line)
+        if key not in seen:
+            seen[key] = f
+    return sorted(seen.values(), key=lambda x: (x.line, x.rule_id))
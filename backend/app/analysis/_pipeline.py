@@ -0,0 +1,126 @@
+"""Single-pass analysis pipeline. Parse once, walk once, dispatch each node to every enabled rule set."""
+from __future__ import annotations
+
+import ast
+from functools import lru_cache
+from typing import Callable, Dict, List, Optional, Sequence, Tuple, Type
+
+from app.ast_cache import get_ast
+from app.schemas import RawFinding, StaticAnalysisFinding
+
+
+class RuleSet:
+    """
+    Rule handlers for one analysis domain. Subclasses define visit_<NodeType>(node) and optionally
+    leave_<NodeType>(node); handlers never recurse, the pipeline owns traversal.
+    """
+
+    domain: str = ""
+
+    def __init__(self, source: str, tree: ast.Module) -> None:
+        self.source = source
+        self.tree = tree
+        self.findings: List[RawFinding] = []
+
+    def results(self) -> List[RawFinding]:
+        """Findings after the walk. Override for post-walk work (non-AST scans, dedupe)."""
+        return self.findings
+
+
+_HandlerNames = Tuple[Tuple[str, str], ...]
+
+
+@lru_cache(maxsize=None)
+def _handler_names(rule_set: Type[RuleSet]) -> Tuple[_HandlerNames, _HandlerNames]:
+    """(node type, attribute) pairs of a rule set's visit_ and leave_ handlers. dir() runs once per class."""
+    attrs = dir(rule_set)
+    return (
+        tuple((attr[6:], attr) for attr in attrs if attr.startswith("visit_")),
+        tuple((attr[6:], attr) for attr in attrs if attr.startswith("leave_")),
+    )
+
+
+class MultiRuleVisitor:
+    """Walks the tree once; each node is handed to the visit_/leave_ handlers of every rule set."""
+
+    def __init__(self, rule_sets: Sequence[RuleSet]) -> None:
+        self._enter: Dict[str, List[Callable[[ast.AST], None]]] = {}
+        self._leave: Dict[str, List[Callable[[ast.AST], None]]] = {}
+        for rule_set in rule_sets:
+            enter_names, leave_names = _handler_names(type(rule_set))
+            for name, attr in enter_names:
+                self._enter.setdefault(name, []).append(getattr(rule_set, attr))
+            for name, attr in leave_names:
+                self._leave.setdefault(name, []).append(getattr(rule_set, attr))
+
+    def visit(self, root: ast.AST) -> None:
+        """
+        Pre-order walk over an explicit stack (same order as NodeVisitor). Load/Store/Del context
+        leaves are never pushed: no rule looks at them and they are a large share of all nodes.
+        """
+        enter, leave = self._enter, self._leave
+        stack: List[Tuple[ast.AST, bool]] = [(root, False)]
+        while stack:
+            node, leaving = stack.pop()
+            name = node.__class__.__name__
+            if leaving:
+                for handler in leave[name]:
+                    handler(node)
+                continue
+            for handler in enter.get(name, ()):
+                handler(node)
+            if name in leave:
+                stack.append((node, True))
+            children = [(c, False) for c in ast.iter_child_nodes(node) if not isinstance(c, ast.expr_context)]
+            children.reverse()
+            stack.extend(children)
+
+
+def run_pipeline(
+    source: str, rule_sets: Sequence[Type[RuleSet]], tree: Optional[ast.Module] = None
+) -> Dict[str, List[StaticAnalysisFinding]]:
+    """
+    Parse source once and run all given rule sets in one traversal. Returns findings keyed by domain.
+    Callers that already hold the parsed module for source can pass it as tree to skip the parse.
+    """
+    if tree is not None:
+        return run_tree(source, tree, rule_sets)
+    # Single entry check for every engine: empty, whitespace-only (isspace avoids a strip() copy) or invalid.
+    tree = get_ast(source) if rule_sets and source and not source.isspace() else None
+    if tree is None:
+        return {rs.domain: [] for rs in rule_sets}
+    return run_tree(source, tree, rule_sets)
+
+
+def run_tree(
+    source: str, tree: ast.Module, rule_sets: Sequence[Type[RuleSet]]
+) -> Dict[str, List[StaticAnalysisFinding]]:
+    """Run rule sets over an already-parsed tree in one traversal. Returns findings keyed by domain."""
+    instances = [rs(source, tree) for rs in rule_sets]
+    MultiRuleVisitor(instances).visit(tree)
+    # Pydantic models are built only here, for the findings that survive dedupe.
+    return {r.domain: [f.to_finding() for f in r.results()] for r in instances}
+
+
+def run_memoized(
+    rule_set: Type[RuleSet],
+    source: str,
+    tree: Optional[ast.Module] = None,
+    has_trigger: Optional[Callable[[str], bool]] = None,
+) -> List[StaticAnalysisFinding]:
+    """
+    Findings of one rule set, memoized by source text (rules are fixed per process). has_trigger is a cheap
+    necessary condition: ASCII source for which it returns False is never parsed. Non-ASCII source always
+    runs, since identifiers are NFKC-normalized and can spell a trigger without containing it. A passed tree
+    bypasses the memo. Each call returns a fresh list; the findings in it are shared and must not be mutated.
+    """
+    if has_trigger is not None and source.isascii() and not has_trigger(source):
+        return []
+    if tree is not None:
+        return run_tree(source, tree, [rule_set])[rule_set.domain]
+    return list(_memoized(rule_set, source))
+
+
+@lru_cache(maxsize=64)
+def _memoized(rule_set: Type[RuleSet], source: str) -> Tuple[StaticAnalysisFinding, ...]:
+    return tuple(run_pipeline(source, [rule_set])[rule_set.domain])
@@ -2,52 +2,68 @@
 from __future__ import annotations
 
 import ast
-from typing import List, Set
+import sys
+from typing import FrozenSet, List, Optional
 
-from app.schemas import Location, StaticAnalysisFinding
+from app.analysis._dedupe import dedupe
+from app.analysis._pipeline import RuleSet, run_pipeline
+from app.schemas import RawFinding, StaticAnalysisFinding
+
+
+_SHADOW_EXPL = sys.intern("'{}' shadows a name from module scope.")
 
 
 def _line(node: ast.AST) -> int:
     return getattr(node, "lineno", 1) or 1
 
 
-def run_dataflow(source: str) -> List[StaticAnalysisFinding]:
+class DataflowRules(RuleSet):
+    """Snippet-local data-flow: variable shadowing (inner scope redefining outer)."""
+
+    domain = "dataflow"
+
+    def __init__(self, source: str, tree: ast.Module) -> None:
+        super().__init__(source, tree)
+        self.module_names: FrozenSet[str] = frozenset(
+            t.id
+            for stmt in tree.body
+            if isinstance(stmt, ast.Assign)
+            for t in stmt.targets
+            if isinstance(t, ast.Name)
+        )
+        self.in_function: Optional[str] = None
+        self._outer: List[Optional[str]] = []
+
+    def visit_FunctionDef(self, node: ast.FunctionDef) -> None:
+        self._outer.append(self.in_function)
+        self.in_function = node.name
+
+    def leave_FunctionDef(self, node: ast.FunctionDef) -> None:
+        self.in_function = self._outer.pop()
+
+    def visit_Assign(self, n: ast.Assign) -> None:
+        if self.in_function is None:
+            return
+        for t in n.targets:
+            if isinstance(t, ast.Name) and t.id in self.module_names:
+                self.findings.append(
+                    RawFinding(
+                        domain="dataflow",
+                        rule_id="dataflow.shadowing",
+                        title="Variable shadowing",
+                        line=_line(n),
+                        function=self.in_function,
+                        severity="advisory",
+                        explanation=_SHADOW_EXPL,
+                        args=(t.id,),
+                        suggestion="Rename the inner variable to avoid confusion.",
+                    )
+                )
+
+    def results(self) -> List[RawFinding]:
+        return dedupe(self.findings)
+
+
+def run_dataflow(source: str, tree: Optional[ast.Module] = None) -> List[StaticAnalysisFinding]:
     """Snippet-local data-flow: variable shadowing (inner scope redefining outer)."""
-    if not source or not source.strip():
-        return []
-    try:
-        tree = ast.parse(source)
-    except SyntaxError:
-        return []
-    findings: List[StaticAnalysisFinding] = []
-    module_names: Set[str] = set()
-    for stmt in tree.body:
-        if isinstance(stmt, ast.Assign):
-            for t in stmt.targets:
-                if isinstance(t, ast.Name):
-                    module_names.add(t.id)
-    for node in ast.walk(tree):
-        if isinstance(node, ast.FunctionDef):
-            for n in ast.walk(node):
-                if isinstance(n, ast.Assign):
-                    for t in n.targets:
-                        if isinstance(t, ast.Name) and t.id in module_names:
-                            findings.append(
-                                StaticAnalysisFinding(
-                                    domain="dataflow",
-                                    rule_id="dataflow.shadowing",
-                                    title="Variable shadowing",
-                                    location=Location(line=_line(n), function=node.name),
-                                    severity="advisory",
-                                    explanation=f"'{t.id}' shadows a name from module scope.",
-                                    suggestion="Rename the inner variable to avoid confusion.",
-                                )
-                            )
-    seen: set[tuple[str, int]] = set()
-    unique = []
-    for f in sorted(findings, key=lambda x: (x.location.line, x.rule_id)):
-        key = (f.rule_id, f.location.line)
-        if key not in seen:
-            seen.add(key)
-            unique.append(f)
-    return unique
+    return run_pipeline(source, [DataflowRules], tree)["dataflow"]
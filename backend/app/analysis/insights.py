@@ -2,9 +2,13 @@
 from __future__ import annotations
 
 import re
-from typing import List
+from functools import lru_cache
+from typing import List, Tuple
 
-from app.schemas import Location, StaticAnalysisFinding
+from app.schemas import RawFinding, StaticAnalysisFinding
+
+_CYCLO_RE = re.compile(r"Cyclomatic complexity:\s*(\d+)")
+_DEPTH_RE = re.compile(r"max nesting depth:\s*(\d+)")
 
 
 def run_insights(
@@ -15,39 +19,50 @@ def run_insights(
     Synthesize high-level insights from existing findings. Does not suppress any finding.
     E.g. repeated security signals → elevated risk; large + complex + nested → multiple responsibilities.
     """
-    insights: List[StaticAnalysisFinding] = []
-    security_count = sum(1 for f in findings_so_far if f.domain == "security")
+    # Only security counts and metrics explanations drive insights; that small tuple is the cache key.
+    signals = tuple(
+        (f.domain, f.explanation if f.domain == "metrics" else "")
+        for f in findings_so_far
+        if f.domain in ("security", "metrics")
+    )
+    return [i.to_finding() for i in _synthesize(signals)]
+
+
+@lru_cache(maxsize=128)
+def _synthesize(signals: Tuple[Tuple[str, str], ...]) -> Tuple[RawFinding, ...]:
+    """Insights for (domain, explanation) signals. Pure, so repeated analyses of a snippet reuse the result."""
+    insights: List[RawFinding] = []
+    security_count = sum(1 for domain, _ in signals if domain == "security")
     if security_count >= 2:
         insights.append(
-            StaticAnalysisFinding(
+            RawFinding(
                 domain="insights",
                 rule_id="insights.elevated_risk",
                 title="Elevated risk profile",
-                location=Location(line=1),
+                line=1,
                 severity="advisory",
                 explanation=f"Multiple security signals ({security_count}) in snippet; consider focused review.",
                 suggestion="Address security findings and re-run analysis.",
             )
         )
-    metrics_findings = [f for f in findings_so_far if f.domain == "metrics"]
-    for m in metrics_findings:
-        if "nesting depth" not in m.explanation or "Cyclomatic" not in m.explanation:
+    for domain, explanation in signals:
+        if domain != "metrics" or "nesting depth" not in explanation or "Cyclomatic" not in explanation:
             continue
-        cyclo_match = re.search(r"Cyclomatic complexity:\s*(\d+)", m.explanation)
-        depth_match = re.search(r"max nesting depth:\s*(\d+)", m.explanation)
+        cyclo_match = _CYCLO_RE.search(explanation)
+        depth_match = _DEPTH_RE.search(explanation)
         cyclo = int(cyclo_match.group(1)) if cyclo_match else 0
         depth = int(depth_match.group(1)) if depth_match else 0
         if cyclo > 5 or depth > 2:
             insights.append(
-                StaticAnalysisFinding(
+                RawFinding(
                     domain="insights",
                     rule_id="insights.complexity_context",
                     title="Complexity context",
-                    location=Location(line=1),
+                    line=1,
                     severity="advisory",
                     explanation="Metrics indicate non-trivial complexity; function may have multiple responsibilities.",
                     suggestion="Consider splitting or simplifying; use metrics to prioritize review.",
                 )
             )
             break
-    return insights
+    return tuple(insights)
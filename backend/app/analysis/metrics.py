@@ -2,66 +2,73 @@
 from __future__ import annotations
 
 import ast
-from typing import List
+import sys
+from typing import List, Optional, Tuple
 
-from app.schemas import Location, StaticAnalysisFinding
+from app.analysis._pipeline import RuleSet, run_pipeline
+from app.schemas import RawFinding, StaticAnalysisFinding
+
+
+_COMPLEXITY_EXPL = sys.intern("Cyclomatic complexity: {}; max nesting depth: {}. Reported for review.")
 
 
 def _line(node: ast.AST) -> int:
     return getattr(node, "lineno", 1) or 1
 
 
-def _cyclomatic(node: ast.AST) -> int:
-    """Cyclomatic complexity: 1 + decision points."""
-    total = 1
-    for n in ast.walk(node):
-        if isinstance(n, (ast.If, ast.While, ast.For, ast.ExceptHandler)):
-            total += 1
+_DECISION_TYPES = (ast.If, ast.For, ast.While, ast.ExceptHandler)
+_NESTING_TYPES = (ast.If, ast.For, ast.While, ast.With, ast.Try)
+
+
+def _complexity(node: ast.AST) -> Tuple[int, int]:
+    """
+    (cyclomatic, max nesting depth) for a function in one iterative DFS. An explicit stack of
+    (node, depth) replaces NodeVisitor's recursive visit/generic_visit frames per node.
+    """
+    cyclo = 1
+    max_depth = 0
+    stack = [(node, 0)]
+    while stack:
+        n, depth = stack.pop()
+        if isinstance(n, _DECISION_TYPES):
+            cyclo += 1
         elif isinstance(n, ast.BoolOp):
-            total += len(n.values) - 1
+            cyclo += len(n.values) - 1
         elif isinstance(n, ast.comprehension):
-            total += 1
-            total += len(n.ifs or [])
-    return total
+            # ifs is always a list on ast.comprehension; no `or []` fallback needed.
+            cyclo += 1 + len(n.ifs)
+        if isinstance(n, _NESTING_TYPES):
+            depth += 1
+            if depth > max_depth:
+                max_depth = depth
+        stack.extend((c, depth) for c in ast.iter_child_nodes(n))
+    return cyclo, max_depth
+
 
+class MetricsRules(RuleSet):
+    """Report cyclomatic complexity and nesting depth per function. Report only, not enforced."""
+
+    domain = "metrics"
 
-def _nesting_depth(node: ast.AST) -> int:
-    """Max nesting depth under this node (if/for/while/with/try)."""
-    if isinstance(node, (ast.If, ast.For, ast.While, ast.With, ast.Try)):
-        child_max = 0
-        for c in ast.iter_child_nodes(node):
-            child_max = max(child_max, _nesting_depth(c))
-        return 1 + child_max
-    return max((_nesting_depth(c) for c in ast.iter_child_nodes(node)), default=0)
+    def visit_FunctionDef(self, node: ast.FunctionDef) -> None:
+        cyclo, max_depth = _complexity(node)
+        self.findings.append(
+            RawFinding(
+                domain="metrics",
+                rule_id="metrics.complexity",
+                title="Function complexity metrics",
+                line=_line(node),
+                function=node.name,
+                severity="advisory",
+                explanation=_COMPLEXITY_EXPL,
+                args=(cyclo, max_depth),
+                suggestion="High values may indicate need for simplification or extraction.",
+            )
+        )
 
+    visit_AsyncFunctionDef = visit_FunctionDef
 
-def run_metrics(source: str) -> List[StaticAnalysisFinding]:
+
+def run_metrics(source: str, tree: Optional[ast.Module] = None) -> List[StaticAnalysisFinding]:
     """Report cyclomatic complexity and nesting depth per function. Report only, not enforced."""
-    if not source or not source.strip():
-        return []
-    try:
-        tree = ast.parse(source)
-    except SyntaxError:
-        return []
-    findings: List[StaticAnalysisFinding] = []
-    for node in ast.walk(tree):
-        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
-            cyclo = _cyclomatic(node)
-            depth = 0
-            for n in ast.walk(node):
-                if isinstance(n, (ast.If, ast.For, ast.While, ast.With, ast.Try)):
-                    d = _nesting_depth(n)
-                    if d > depth:
-                        depth = d
-            findings.append(
-                StaticAnalysisFinding(
-                    domain="metrics",
-                    rule_id="metrics.complexity",
-                    title="Function complexity metrics",
-                    location=Location(line=_line(node), function=node.name),
-                    severity="advisory",
-                    explanation=f"Cyclomatic complexity: {cyclo}; max nesting depth: {depth}. Reported for review.",
-                    suggestion="High values may indicate need for simplification or extraction.",
-                )
-            )
-    return findings
+    return run_pipeline(source, [MetricsRules], tree)["metrics"]
@@ -3,96 +3,147 @@ from __future__ import annotations
 
 import ast
 import re
-from typing import List
+import sys
+from typing import Iterator, List, Optional
 
-from app.schemas import Location, StaticAnalysisFinding
+from app.analysis._dedupe import dedupe
+from app.analysis._pipeline import RuleSet, run_memoized
+from app.schemas import RawFinding, StaticAnalysisFinding
 
 
 def _line(node: ast.AST) -> int:
     return getattr(node, "lineno", 1) or 1
 
 
-# Pattern-based credential hints (advisory only)
-CREDENTIAL_PATTERNS = [
-    (re.compile(r"(?i)(password|passwd|pwd)\s*=\s*['\"][^'\"]+['\"]"), "Hard-coded password"),
-    (re.compile(r"(?i)(api[_-]?key|apikey)\s*=\s*['\"][^'\"]+['\"]"), "Hard-coded API key"),
-    (re.compile(r"(?i)(secret)\s*=\s*['\"][^'\"]+['\"]"), "Hard-coded secret"),
-]
+# Pattern-based credential hints (advisory only). One fused pattern finds the lines worth reporting in a
+# single scan of the source; the per-kind patterns, in title priority order, then pick the title, as the
+# old per-line loop did. Character classes exclude newlines so a match never spans lines.
+_CRED_VALUE = r"[^\S\n]*=[^\S\n]*['\"][^'\"\n]+['\"]"
+_CRED_KINDS = (
+    ("Hard-coded password", r"password|passwd|pwd"),
+    ("Hard-coded API key", r"api[_-]?key"),
+    ("Hard-coded secret", r"secret"),
+)
+_CRED_RE = re.compile("(?i)(?:" + "|".join(kw for _, kw in _CRED_KINDS) + ")" + _CRED_VALUE)
+_CRED_TITLE_PATTERNS = tuple((re.compile("(?i)(?:" + kw + ")" + _CRED_VALUE), title) for title, kw in _CRED_KINDS)
+# Every _CRED_RE match contains one of these (lowercased); a C-level substring test rules out most snippets.
+_CRED_KEYWORDS = ("passw", "pwd", "api", "secret")
 
 
-def run_security(source: str) -> List[StaticAnalysisFinding]:
+# Rule ids are interned once: every finding, cache key and == comparison then shares one string object.
+_RID_EVAL = sys.intern("security.dangerous_eval")
+_RID_DESERIALIZE = sys.intern("security.unsafe_deserialization")
+_RID_SHELL = sys.intern("security.shell_exec")
+_RID_CREDENTIAL = sys.intern("security.hardcoded_credential")
+
+# Dangerous calls: one hash lookup per call site, on the bare name or the (module, attribute) pair.
+_BARE_DANGEROUS_CALLS = {
+    "eval": _RID_EVAL,
+    "exec": _RID_EVAL,
+}
+_DANGEROUS_CALLS = {
+    ("pickle", "loads"): _RID_DESERIALIZE,
+    ("os", "system"): _RID_SHELL,
+    ("os", "popen"): _RID_SHELL,
+    ("os", "call"): _RID_SHELL,
+    ("subprocess", "system"): _RID_SHELL,
+    ("subprocess", "popen"): _RID_SHELL,
+    ("subprocess", "call"): _RID_SHELL,
+}
+# Necessary condition for any finding: a dangerous call name or attribute, or a credential keyword.
+_TRIGGER_RE = re.compile(
+    "|".join(sorted({*_BARE_DANGEROUS_CALLS, *(attr for _, attr in _DANGEROUS_CALLS)}))
+    + "|(?i:" + "|".join(_CRED_KEYWORDS) + ")"
+)
+# rule_id -> (title, explanation, suggestion)
+_CALL_RULES = {
+    _RID_EVAL: (
+        "Use of eval/exec",
+        "eval/exec can execute arbitrary code; security risk if input is untrusted.",
+        "Avoid eval/exec; use ast.literal_eval or structured parsing where possible.",
+    ),
+    _RID_DESERIALIZE: (
+        "Unsafe deserialization (pickle)",
+        "Pickle deserialization can execute arbitrary code. Security signal.",
+        "Prefer JSON or other safe formats; if pickle is required, ensure trusted source only.",
+    ),
+    _RID_SHELL: (
+        "Shell execution",
+        "Shell execution without sanitization can be dangerous with user input.",
+        "Validate/sanitize input; prefer subprocess with list args over shell=True.",
+    ),
+}
+
+
+class SecurityRules(RuleSet):
     """Basic security smells: eval/exec, pickle, shell, hardcoded credentials. Advisory only."""
-    if not source or not source.strip():
-        return []
-    try:
-        tree = ast.parse(source)
-    except SyntaxError:
-        return []
-    findings: List[StaticAnalysisFinding] = []
-    lines = source.splitlines()
-    for node in ast.walk(tree):
-        if isinstance(node, ast.Call):
-            func = node.func
-            if isinstance(func, ast.Name):
-                if func.id in ("eval", "exec"):
-                    findings.append(
-                        StaticAnalysisFinding(
-                            domain="security",
-                            rule_id="security.dangerous_eval",
-                            title="Use of eval/exec",
-                            location=Location(line=_line(node)),
-                            severity="advisory",
-                            explanation="eval/exec can execute arbitrary code; security risk if input is untrusted.",
-                            suggestion="Avoid eval/exec; use ast.literal_eval or structured parsing where possible.",
-                        )
-                    )
-            if isinstance(func, ast.Attribute) and isinstance(func.value, ast.Name):
-                if func.attr == "loads" and func.value.id == "pickle":
-                    findings.append(
-                        StaticAnalysisFinding(
-                            domain="security",
-                            rule_id="security.unsafe_deserialization",
-                            title="Unsafe deserialization (pickle)",
-                            location=Location(line=_line(node)),
-                            severity="advisory",
-                            explanation="Pickle deserialization can execute arbitrary code. Security signal.",
-                            suggestion="Prefer JSON or other safe formats; if pickle is required, ensure trusted source only.",
-                        )
-                    )
-                if func.attr in ("system", "popen", "call") and func.value.id in ("os", "subprocess"):
-                    findings.append(
-                        StaticAnalysisFinding(
-                            domain="security",
-                            rule_id="security.shell_exec",
-                            title="Shell execution",
-                            location=Location(line=_line(node)),
-                            severity="advisory",
-                            explanation="Shell execution without sanitization can be dangerous with user input.",
-                            suggestion="Validate/sanitize input; prefer subprocess with list args over shell=True.",
-                        )
-                    )
-    for i, line in enumerate(lines):
-        for pat, title in CREDENTIAL_PATTERNS:
-            if pat.search(line):
-                findings.append(
-                    StaticAnalysisFinding(
-                        domain="security",
-                        rule_id="security.hardcoded_credential",
-                        title=title,
-                        location=Location(line=i + 1),
-                        severity="advisory",
-                        explanation="Possible hard-coded credential detected. Security signal.",
-                        suggestion="Use environment variables or a secrets manager; never commit credentials.",
-                    )
-                )
-                break
-    seen: set[tuple[str, int]] = set()
-    unique = []
-    for f in sorted(findings, key=lambda x: (x.location.line, x.rule_id)):
-        key = (f.rule_id, f.location.line)
-        if key not in seen:
-            seen.add(key)
-            unique.append(f)
-    return unique
+
+    domain = "security"
+
+    def visit_Call(self, node: ast.Call) -> None:
+        func = node.func
+        if isinstance(func, ast.Name):
+            rule_id = _BARE_DANGEROUS_CALLS.get(func.id)
+        elif isinstance(func, ast.Attribute) and isinstance(func.value, ast.Name):
+            rule_id = _DANGEROUS_CALLS.get((func.value.id, func.attr))
+        else:
+            return
+        if rule_id is None:
+            return
+        title, explanation, suggestion = _CALL_RULES[rule_id]
+        self.findings.append(
+            RawFinding(
+                domain="security",
+                rule_id=rule_id,
+                title=title,
+                line=_line(node),
+                severity="advisory",
+                explanation=explanation,
+                suggestion=suggestion,
+            )
+        )
+
+    def results(self) -> List[RawFinding]:
+        findings = self.findings
+        lowered = self.source.lower()
+        if any(k in lowered for k in _CRED_KEYWORDS):
+            findings.extend(_scan_credentials(self.source))
+        return dedupe(findings)
+
+
+def _scan_credentials(source: str) -> Iterator[RawFinding]:
+    """At most one hard-coded credential finding per line, from a single scan of the whole source."""
+    # ast also ends a line at "\r\n" and at a lone "\r"; normalise so line numbers agree with it.
+    if "\r" in source:
+        source = source.replace("\r\n", "\n").replace("\r", "\n")
+    # Line numbers from match offsets: count newlines only between consecutive matches.
+    line, pos, last_line = 1, 0, 0
+    for m in _CRED_RE.finditer(source):
+        line += source.count("\n", pos, m.start())
+        pos = m.start()
+        if line == last_line:
+            continue
+        last_line = line
+        end = source.find("\n", pos)
+        text = source[source.rfind("\n", 0, pos) + 1:end if end >= 0 else None]
+        yield RawFinding(
+            domain="security",
+            rule_id=_RID_CREDENTIAL,
+            title=next(title for pat, title in _CRED_TITLE_PATTERNS if pat.search(text)),
+            line=line,
+            severity="advisory",
+            explanation="Possible hard-coded credential detected. Security signal.",
+            suggestion="Use environment variables or a secrets manager; never commit credentials.",
+        )
+
+def _has_trigger(source: str) -> bool:
+    """True if source names a dangerous call or attribute, or contains a credential keyword."""
+    return _TRIGGER_RE.search(source) is not None
 
 
+def run_security(source: str, tree: Optional[ast.Module] = None) -> List[StaticAnalysisFinding]:
+    """
+    Basic security smells: eval/exec, pickle, shell, hardcoded credentials. Advisory only.
+    Memoized by source; source without any trigger token is not parsed.
+    """
+    return run_memoized(SecurityRules, source, tree, _has_trigger)
@@ -2,63 +2,69 @@
 from __future__ import annotations
 
 import ast
-from typing import List
+import sys
+from typing import List, Optional
 
-from app.schemas import Location, StaticAnalysisFinding
+from app.analysis._dedupe import dedupe
+from app.analysis._pipeline import RuleSet, run_memoized
+from app.schemas import RawFinding, StaticAnalysisFinding
 
 
 def _line(node: ast.AST) -> int:
     return getattr(node, "lineno", 1) or 1
 
 
-def _check_any_usage(tree: ast.AST) -> List[StaticAnalysisFinding]:
+# Interned once (as in security.py): findings share one string object per rule.
+_RID_RETURN_ANY = sys.intern("types.return_any")
+_RID_PARAM_ANY = sys.intern("types.param_any")
+
+
+class TypeRules(RuleSet):
     """Excessive or unsafe use of Any. AST: look for ast.Name(id='Any') in annotations."""
-    findings: List[StaticAnalysisFinding] = []
-    for n in ast.walk(tree):
-        if isinstance(n, ast.FunctionDef) and n.returns is not None:
-            if isinstance(n.returns, ast.Name) and n.returns.id == "Any":
-                findings.append(
-                    StaticAnalysisFinding(
-                        domain="types",
-                        rule_id="types.return_any",
-                        title="Return type is Any",
-                        location=Location(line=_line(n), function=n.name),
-                        severity="advisory",
-                        explanation="Return type annotated as Any loses type safety and intent.",
-                        suggestion="Use a concrete return type where possible.",
-                    )
+
+    domain = "types"
+
+    def visit_FunctionDef(self, n: ast.FunctionDef) -> None:
+        if n.returns is not None and isinstance(n.returns, ast.Name) and n.returns.id == "Any":
+            self.findings.append(
+                RawFinding(
+                    domain="types",
+                    rule_id=_RID_RETURN_ANY,
+                    title="Return type is Any",
+                    line=_line(n),
+                    function=n.name,
+                    severity="advisory",
+                    explanation="Return type annotated as Any loses type safety and intent.",
+                    suggestion="Use a concrete return type where possible.",
                 )
-        if isinstance(n, ast.arg) and n.annotation is not None:
-            if isinstance(n.annotation, ast.Name) and n.annotation.id == "Any":
-                findings.append(
-                    StaticAnalysisFinding(
-                        domain="types",
-                        rule_id="types.param_any",
-                        title="Parameter typed as Any",
-                        location=Location(line=_line(n)),
-                        severity="advisory",
-                        explanation="Parameter annotated as Any reduces type checking benefit.",
-                        suggestion="Use a more specific type if possible.",
-                    )
+            )
+
+    def visit_arg(self, n: ast.arg) -> None:
+        if n.annotation is not None and isinstance(n.annotation, ast.Name) and n.annotation.id == "Any":
+            self.findings.append(
+                RawFinding(
+                    domain="types",
+                    rule_id=_RID_PARAM_ANY,
+                    title="Parameter typed as Any",
+                    line=_line(n),
+                    severity="advisory",
+                    explanation="Parameter annotated as Any reduces type checking benefit.",
+                    suggestion="Use a more specific type if possible.",
                 )
-    return findings
-
-
-def run_types(source: str) -> List[StaticAnalysisFinding]:
-    """Run type semantics checks. No mypy; no external stubs. Advisory/warning only."""
-    if not source or not source.strip():
-        return []
-    try:
-        tree = ast.parse(source)
-    except SyntaxError:
-        return []
-    findings: List[StaticAnalysisFinding] = []
-    findings.extend(_check_any_usage(tree))
-    seen: set[tuple[str, int]] = set()
-    unique = []
-    for f in sorted(findings, key=lambda x: (x.location.line, x.rule_id)):
-        key = (f.rule_id, f.location.line)
-        if key not in seen:
-            seen.add(key)
-            unique.append(f)
-    return unique
+            )
+
+    def results(self) -> List[RawFinding]:
+        return dedupe(self.findings)
+
+
+def _has_trigger(source: str) -> bool:
+    """Every types finding is an annotation Name "Any"."""
+    return "Any" in source
+
+
+def run_types(source: str, tree: Optional[ast.Module] = None) -> List[StaticAnalysisFinding]:
+    """
+    Run type semantics checks. No mypy; no external stubs. Advisory/warning only.
+    Memoized by source; source that never mentions Any is not parsed.
+    """
+    return run_memoized(TypeRules, source, tree, _has_trigger)
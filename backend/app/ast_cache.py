@@ -0,0 +1,18 @@
+"""Shared parse cache. PYBP and the analysis engines walk the same tree for the same source and never restructure it."""
+from __future__ import annotations
+
+import ast
+from functools import lru_cache
+from typing import Optional
+
+
+@lru_cache(maxsize=64)
+def get_ast(source: str) -> Optional[ast.Module]:
+    """
+    Parsed module for source, or None on SyntaxError. Keyed by the exact source string: the cache has to
+    hold the source to compare keys anyway, and str caches its own hash, so a digest key would only add work.
+    """
+    try:
+        return ast.parse(source)
+    except SyntaxError:
+        return None
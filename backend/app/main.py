@@ -1,25 +1,31 @@
 """PEP 8 Compliance Checker API. Stateless; no execution of user code."""
 from __future__ import annotations
 
-from typing import List, Tuple
+import asyncio
+import io
+import os
+import struct
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from functools import lru_cache
+from operator import itemgetter
+from typing import Any, AsyncIterator, Callable, List, Tuple
 
+import orjson
 import pycodestyle
-from fastapi import FastAPI, Request
+from fastapi import FastAPI, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse
 
 from app.config import get_settings
-from app.pep8_map import get_pep8_info
+from app.pep8_map import get_pep8_info, get_tracked_section_fragments
 from app.schemas import CheckResponse, Issue, StaticAnalysisFinding
 from app.pybp.engine import run_pybp
 from app.pybp.checks import PYBP_RULES
-from app.analysis import (
-    run_types,
-    run_dataflow,
-    run_errors,
-    run_security,
-    run_metrics,
-    run_insights,
-)
+from app.analysis import run_all, run_insights
+from app.ast_cache import get_ast
 
 
 class CollectingReport(pycodestyle.BaseReport):
@@ -28,21 +34,55 @@ class CollectingReport(pycodestyle.BaseReport):
     def init_file(self, filename, lines, expected, line_offset):
         super().init_file(filename, lines, expected, line_offset)
         self._errors: List[Tuple[int, int, str, str]] = []
+        # Errors mostly arrive in (line, offset) order; track that so the common case needs no sort.
+        self._is_sorted = True
+        self._last: Tuple[int, int] = (0, 0)
 
     def error(self, line_number, offset, text, check):
-        code = super().error(line_number, offset, text, check)
-        if code:
-            # text is "E302 expected 2 blank lines..."; code is "E302"
-            self._errors.append((line_number, offset, code, text[5:].strip()))
+        # Same filtering as BaseReport.error, without the per-code counters, first-message table and
+        # totals it keeps for CLI statistics; nothing here reads them.
+        code = text[:4]
+        if self._ignore_code(code) or code in self.expected:
+            return None
+        # text is "E302 expected 2 blank lines..."; code is "E302". Kept whole; sliced once per Issue.
+        self._errors.append((line_number, offset, code, text))
+        if (line_number, offset) < self._last:
+            self._is_sorted = False
+        else:
+            self._last = (line_number, offset)
         return code
 
     def get_file_results(self):
+        """Errors ordered by (line, offset); sorted only when checks reported out of order."""
+        if not self._is_sorted:
+            self._errors.sort(key=itemgetter(0, 1))
+            self._is_sorted = True
         return self._errors
 
+
+@asynccontextmanager
+async def _lifespan(_app: FastAPI) -> AsyncIterator[None]:
+    """
+    Warm up before serving: build the pycodestyle options, run every engine once (first-call imports,
+    check registry and regex compilation) and spin up engine pool threads, so the first request
+    does not pay for it.
+    """
+    await asyncio.gather(
+        _offload(True, [], _run_pycodestyle, _WARM_SOURCE),
+        _offload(True, [], run_pybp, _WARM_SOURCE, PYBP_RULES),
+        _offload(True, {}, run_all, _WARM_SOURCE),
+    )
+    yield
+
+
+_WARM_SOURCE = "def f(x: int) -> int:\n    return x\n"
+
 app = FastAPI(
     title="PEP 8 Compliance Checker API",
     description="Validate Python code against PEP 8. No execution of user code.",
     version="0.1.0",
+    default_response_class=ORJSONResponse,
+    lifespan=_lifespan,
 )
 settings = get_settings()
 
@@ -53,6 +93,27 @@ app.add_middleware(
     allow_methods=["GET", "POST", "OPTIONS"],
     allow_headers=["Content-Type"],
 )
+# Issue payloads repeat the same PEP 8 quotes and suggestions; they compress by an order of magnitude.
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=6)
+
+# Section URLs depend only on settings; build each once rather than formatting one per issue.
+_SECTION_URLS = {frag: f"{settings.pep8_url}#{frag}" for frag in get_tracked_section_fragments()}
+
+# Engines are pure functions of the source; a shared pool keeps CPU-bound work off the event loop.
+# Sized to the host, but never below the three jobs a single request fans out to.
+_ENGINE_POOL = ThreadPoolExecutor(max_workers=max(3, os.cpu_count() or 1), thread_name_prefix="pspec-engine")
+
+# Recent successful responses by (code, packed enabled-engine flags). Re-checks of unchanged code
+# (editor saves, re-submits) skip every engine. Only touched from the event loop, so no lock.
+_RESPONSE_CACHE: "OrderedDict[Tuple[str, bytes], CheckResponse]" = OrderedDict()
+_RESPONSE_CACHE_SIZE = 128
+
+
+async def _offload(enabled: Any, default: Any, fn: Callable[..., Any], *args: Any) -> Any:
+    """Run fn(*args) on the engine pool when enabled; otherwise return default without scheduling."""
+    if not enabled:
+        return default
+    return await asyncio.get_running_loop().run_in_executor(_ENGINE_POOL, fn, *args)
 
 
 @app.post(
@@ -60,13 +121,13 @@ app.add_middleware(
     response_model=CheckResponse,
     responses={200: {"description": "Always 200; see body ok/error and issues."}},
 )
-async def check_pep8(request: Request) -> CheckResponse:
+async def check_pep8(request: Request) -> Response:
     """
     Validate request body code against PEP 8. Returns issues with PEP 8 quote and suggestion.
     No code execution; static analysis only.
     """
-    def err_res(msg: str) -> CheckResponse:
-        return CheckResponse(
+    def err_res(msg: str) -> Response:
+        return _respond(CheckResponse(
             ok=False,
             pep8_date=settings.pep8_date,
             pep8_url=settings.pep8_url,
@@ -75,48 +136,65 @@ async def check_pep8(request: Request) -> CheckResponse:
             advisories=[],
             findings=[],
             error=msg,
-        )
+        ))
     try:
-        body = await request.json()
+        body = orjson.loads(await request.body())
     except Exception as e:
         return err_res(f"Invalid JSON: {e!s}")
     code = body.get("code") if isinstance(body, dict) else None
     if not isinstance(code, str):
         return err_res("Missing or invalid 'code' field (must be a string).")
-    if len(code.encode("utf-8")) > settings.max_code_length:
+    if not code:
+        # Nothing to check: every engine reports nothing for empty source.
+        return _respond(_CLEAN_RESPONSE)
+    # Each char is 1-4 UTF-8 bytes: only near or over the limit does the byte length need checking.
+    n_chars = len(code)
+    if n_chars > settings.max_code_length or (
+        n_chars * 4 > settings.max_code_length and len(code.encode("utf-8")) > settings.max_code_length
+    ):
         return err_res(f"Code exceeds maximum length ({settings.max_code_length} bytes).")
-    enable_pep8 = body.get("enable_pep8", settings.enable_pep8) if isinstance(body, dict) else settings.enable_pep8
-    enable_pybp = body.get("enable_pybp", body.get("pybp_enabled", settings.enable_pybp)) if isinstance(body, dict) else settings.enable_pybp
-    issues = _run_pycodestyle(code) if enable_pep8 else []
-    advisories = run_pybp(code, PYBP_RULES) if (isinstance(enable_pybp, bool) and enable_pybp) else []
+    # Past the code check body is known to be a dict; flags fall back to settings defaults.
+    enable_pep8 = body.get("enable_pep8", settings.enable_pep8)
+    enable_pybp = body.get("enable_pybp", body.get("pybp_enabled", settings.enable_pybp))
+    enable_insights = body.get("enable_insights", settings.enable_insights)
     findings: List[StaticAnalysisFinding] = []
-    if isinstance(body, dict):
-        enable_types = body.get("enable_types", settings.enable_types)
-        enable_dataflow = body.get("enable_dataflow", settings.enable_dataflow)
-        enable_errors = body.get("enable_errors", settings.enable_errors)
-        enable_security = body.get("enable_security", settings.enable_security)
-        enable_metrics = body.get("enable_metrics", settings.enable_metrics)
-        enable_insights = body.get("enable_insights", settings.enable_insights)
-    else:
-        enable_types = settings.enable_types
-        enable_dataflow = settings.enable_dataflow
-        enable_errors = settings.enable_errors
-        enable_security = settings.enable_security
-        enable_metrics = settings.enable_metrics
-        enable_insights = settings.enable_insights
-    if enable_types:
-        findings.extend(run_types(code))
-    if enable_dataflow:
-        findings.extend(run_dataflow(code))
-    if enable_errors:
-        findings.extend(run_errors(code))
-    if enable_security:
-        findings.extend(run_security(code))
-    if enable_metrics:
-        findings.extend(run_metrics(code))
+    enabled = {
+        "types": body.get("enable_types", settings.enable_types),
+        "dataflow": body.get("enable_dataflow", settings.enable_dataflow),
+        "errors": body.get("enable_errors", settings.enable_errors),
+        "security": body.get("enable_security", settings.enable_security),
+        "metrics": body.get("enable_metrics", settings.enable_metrics),
+    }
+    # One validation, parse and tree walk for every enabled engine.
+    domains = [d for d, on in enabled.items() if on]
+    run_pep8 = bool(enable_pep8)
+    run_pybp_checks = isinstance(enable_pybp, bool) and enable_pybp
+    # The response is a pure function of (code, enabled engines); settings are fixed per process.
+    # Keyed on the str itself (as in app.ast_cache): str caches its hash, so no encode or digest per request.
+    cache_key = (
+        code,
+        struct.pack("8?", run_pep8, run_pybp_checks, *(bool(on) for on in enabled.values()), bool(enable_insights)),
+    )
+    cached = _RESPONSE_CACHE.get(cache_key)
+    if cached is not None:
+        _RESPONSE_CACHE.move_to_end(cache_key)
+        return _respond(cached)
+    # Whitespace-only code still has PEP 8 issues (W291/W391...), but no AST findings to look for.
+    has_code = not code.isspace()
+    # PYBP and the analysis pipeline read the same tree: parse once up front so neither thread misses the cache.
+    run_analysis = bool(domains) and has_code
+    tree = await _offload((run_pybp_checks and has_code) or run_analysis, None, get_ast, code)
+    # PEP 8, PYBP and the analysis pipeline are independent; run them together off the event loop.
+    issues, advisories, by_domain = await asyncio.gather(
+        _offload(run_pep8, [], _run_pycodestyle, code),
+        _offload(run_pybp_checks and has_code and tree is not None, [], run_pybp, code, PYBP_RULES),
+        _offload(run_analysis and tree is not None, {}, run_all, code, domains, tree),
+    )
+    for domain_findings in by_domain.values():
+        findings.extend(domain_findings)
     if enable_insights:
         findings.extend(run_insights(code, findings))
-    return CheckResponse(
+    response = _CLEAN_RESPONSE if not (issues or advisories or findings) else CheckResponse(
         ok=True,
         pep8_date=settings.pep8_date,
         pep8_url=settings.pep8_url,
@@ -126,30 +204,70 @@ async def check_pep8(request: Request) -> CheckResponse:
         findings=findings,
         error=None,
     )
+    _RESPONSE_CACHE[cache_key] = response
+    if len(_RESPONSE_CACHE) > _RESPONSE_CACHE_SIZE:
+        _RESPONSE_CACHE.popitem(last=False)
+    return _respond(response)
+
+
+def _respond(response: CheckResponse) -> Response:
+    """
+    Serialize with orjson directly. The model is already validated on construction, so returning a
+    Response skips FastAPI's second response_model validation pass; response_model stays for the docs.
+    """
+    if response is _CLEAN_RESPONSE:
+        return Response(content=_CLEAN_RESPONSE_BYTES, media_type="application/json")
+    return ORJSONResponse(content=response.model_dump())
+
+
+# Clean code gets the same body every time (only settings vary, and they are fixed): build it once.
+_CLEAN_RESPONSE = CheckResponse(
+    ok=True,
+    pep8_date=settings.pep8_date,
+    pep8_url=settings.pep8_url,
+    pep8_revision=settings.pep8_revision,
+    issues=[],
+    advisories=[],
+    findings=[],
+    error=None,
+)
+_CLEAN_RESPONSE_BYTES = orjson.dumps(_CLEAN_RESPONSE.model_dump())
+
+
+@lru_cache(maxsize=1)
+def _get_style_options() -> Any:
+    """
+    StyleGuide setup (option parsing, check registry scan) and the ignore list are request-invariant
+    (settings are frozen); build the options once and share them across requests.
+    """
+    # Merge pycodestyle default ignore with config (so we add suppressions, not replace).
+    default_ignore = getattr(pycodestyle, "DEFAULT_IGNORE", "") or ""
+    ignore_list = [c.strip() for c in default_ignore.split(",") if c.strip()] + settings.pep8_ignore_list
+    return pycodestyle.StyleGuide(quiet=True, ignore=ignore_list).options
 
 
 def _run_pycodestyle(source: str) -> List[Issue]:
     """Run pycodestyle on source string. No file I/O, no execution."""
-    lines = source.splitlines(keepends=True)
+    # Checker indexes a line list, so one split is unavoidable; do it as pycodestyle reads files.
+    # str.splitlines() also breaks on form feeds and other separators, shifting reported line numbers.
+    lines = io.StringIO(source, newline=None).readlines()
     if not lines:
         return []
-    # Merge pycodestyle default ignore with config (so we add suppressions, not replace).
-    default_ignore = getattr(pycodestyle, "DEFAULT_IGNORE", "") or ""
-    base_list = [c.strip() for c in default_ignore.split(",") if c.strip()]
-    ignore_list = base_list + settings.pep8_ignore_list
-    style = pycodestyle.StyleGuide(quiet=True, ignore=ignore_list)
-    report = CollectingReport(style.options)
+    options = _get_style_options()
+    report = CollectingReport(options)
     checker = pycodestyle.Checker(
         lines=lines,
         filename="<paste>",
-        options=style.options,
+        options=options,
         report=report,
     )
     checker.check_all()
     result: List[Issue] = []
     for line_number, offset, code, text in report.get_file_results():
+        # pycodestyle messages are "CODE message" with no surrounding whitespace; drop the code prefix.
+        text = text[5:]
         pep8_quote, pep8_section, suggestion, section_frag = get_pep8_info(code, text)
-        pep8_section_url = f"{settings.pep8_url}#{section_frag}" if section_frag else None
+        pep8_section_url = _SECTION_URLS.get(section_frag) if section_frag else None
         result.append(
             Issue(
                 code=code,
@@ -162,7 +280,6 @@ def _run_pycodestyle(source: str) -> List[Issue]:
                 suggestion=suggestion,
             )
         )
-    result.sort(key=lambda i: (i.line, i.column or 0))
     return result
 
 
@@ -174,4 +291,4 @@ def root():
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run("app.main:app", host="0.0.0.0", port=8000, reload=True)
+    uvicorn.run("app.main:app", host="0.0.0.0", port=8000, reload=True, loop="uvloop", http="httptools")
@@ -3,7 +3,9 @@ Section URL fragment derived from section title. Reference: https://peps.python.
 """
 from __future__ import annotations
 
-from typing import Dict, Optional, Tuple
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Dict, List, Mapping, Optional, Tuple
 
 # PEP 8 section title → URL fragment (peps.python.org/pep-0008/#fragment)
 _SECTION_FRAGMENTS: Dict[str, str] = {
@@ -438,32 +440,42 @@ _RULE_MAP: Dict[str, Tuple[str, str, str]] = {
 
 PEP8_URL = "https://peps.python.org/pep-0008/"
 
+# Both tables are static: fold them into one (quote, section, suggestion, fragment) entry per code.
+_RULE_MAP_FLAT: Dict[str, Tuple[str, str, str, Optional[str]]] = {
+    code: (quote, section, suggestion, _SECTION_FRAGMENTS.get(section) or None)
+    for code, (quote, section, suggestion) in _RULE_MAP.items()
+}
+
+_DEFAULT_ENTRY: Tuple[str, str, str, Optional[str]] = (
+    "This style issue is reported by pycodestyle; see PEP 8 for the full style guide.",
+    "PEP 8",
+    "Review PEP 8 and correct the reported issue.",
+    None,
+)
 
-def get_section_fragment_to_codes() -> Dict[str, list]:
-    """Section URL fragment -> list of rule codes (for change-detection script)."""
-    out: Dict[str, list] = {}
+
+@lru_cache(maxsize=1)
+def get_section_fragment_to_codes() -> Mapping[str, Tuple[str, ...]]:
+    """Section URL fragment -> rule codes (for change-detection script). Built once; read-only."""
+    out: Dict[str, List[str]] = {}
     for code, (_, section, _) in _RULE_MAP.items():
         frag = _SECTION_FRAGMENTS.get(section)
         if frag:
             out.setdefault(frag, []).append(code)
-    return out
+    return MappingProxyType({frag: tuple(codes) for frag, codes in out.items()})
 
 
-def get_tracked_section_fragments() -> list:
-    """Section fragments we track for PEP 8 change detection (non-empty only)."""
-    return [f for f in _SECTION_FRAGMENTS.values() if f]
+@lru_cache(maxsize=1)
+def get_tracked_section_fragments() -> Tuple[str, ...]:
+    """Section fragments we track for PEP 8 change detection (non-empty only). Built once."""
+    return tuple(f for f in _SECTION_FRAGMENTS.values() if f)
 
 
 def get_pep8_info(code: str, message: str) -> Tuple[str, str, str, Optional[str]]:
     """Return (pep8_quote, pep8_section, suggestion, pep8_section_url_fragment) for a pycodestyle code."""
-    entry = _RULE_MAP.get(code)
+    entry = _RULE_MAP_FLAT.get(code)
     if entry:
-        quote, section, suggestion = entry
-        frag = _SECTION_FRAGMENTS.get(section)
-        return (quote, section, suggestion, frag or None)
-    return (
-        "This style issue is reported by pycodestyle; see PEP 8 for the full style guide.",
-        "PEP 8",
-        message or "Review PEP 8 and correct the reported issue.",
-        None,
-    )
+        return entry
+    if not message:
+        return _DEFAULT_ENTRY
+    return (_DEFAULT_ENTRY[0], _DEFAULT_ENTRY[1], message, None)
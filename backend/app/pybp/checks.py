@@ -2,55 +2,72 @@
 from __future__ import annotations
 
 import ast
-from typing import Any, List
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterator, List
 
-from app.pybp.rules import PybpRule
+from app.pybp.rules import PybpRule, make_rule
 
-
-def _line(node: ast.AST) -> int:
-    return getattr(node, "lineno", 1) or 1
-
-
-def _name(node: ast.AST) -> str | None:
-    return getattr(node, "name", None)
+# Statements only ever appear under the module, other statements, except handlers and match cases.
+STMT_PARENTS = (ast.stmt, ast.excepthandler, ast.match_case)
 
 
 # --- Error Handling (§6.6) ---
 
-def _check_bare_except(node: ast.AST, source: str) -> List[dict]:
-    """Bare except: blocks. Authority: Python Docs."""
-    if not isinstance(node, ast.ExceptHandler):
-        return []
+def _check_except_handler(node: ast.ExceptHandler, source: str, in_class: bool) -> List[dict]:
+    """
+    All except-handler rules in one pass over the handler. Authority: Python Docs.
+    Bare except wins; a typed handler whose body is only pass is a swallow, and also a broad catch when it
+    catches Exception. Items name their rule_id, so one registered check reports all three rules.
+    """
     if node.type is None:
         return [
             {
-                "line": _line(node),
+                "rule_id": "pybp.error.bare_except",
+                "line": node.lineno,
                 "explanation": "Bare except: catches all exceptions including BaseException and system exits.",
                 "suggestion": "Catch a specific exception type (e.g. except ValueError:) or at least 'except Exception:'.",
             }
         ]
-    return []
+    if node.body and (len(node.body) > 1 or not isinstance(node.body[0], ast.Pass)):
+        return []
+    items = [
+        {
+            "rule_id": "pybp.error.swallow",
+            "line": node.lineno,
+            "explanation": "Exception is caught but not logged or re-raised; failures can be hard to diagnose.",
+            "suggestion": "At least log the exception; consider re-raising or handling specifically.",
+        }
+    ]
+    caught = node.type
+    name = caught.id if isinstance(caught, ast.Name) else caught.attr if isinstance(caught, ast.Attribute) else None
+    if name == "Exception":
+        items.append(
+            {
+                "rule_id": "pybp.error.broad_catch",
+                "line": node.lineno,
+                "explanation": "Catching Exception with no handling can hide bugs; prefer specific exception types.",
+                "suggestion": "Catch specific exceptions (e.g. ValueError, KeyError) or log and re-raise.",
+            }
+        )
+    return items
 
 
 # --- Function Design (§6.1) ---
 
 def _count_function_lines(node: ast.FunctionDef, source: str) -> int:
     """Line count of function body (excluding decorators/docstring)."""
-    lines = source.splitlines()
-    start = node.lineno - 1
-    end = node.end_lineno if hasattr(node, "end_lineno") and node.end_lineno else start + 1
-    return max(0, end - start)
+    # Only the span is needed; the parser already recorded both ends, so the source is never split.
+    return (node.end_lineno or node.lineno) - node.lineno + 1
 
 
-def _check_long_function(node: ast.AST, source: str) -> List[dict]:
+def _check_long_function(node: ast.FunctionDef, source: str, in_class: bool) -> List[dict]:
     """Excessive function length. Authority: Clean Code."""
-    if not isinstance(node, ast.FunctionDef):
-        return []
     nlines = _count_function_lines(node, source)
     if nlines > 50:
         return [
             {
-                "line": _line(node),
+                "line": node.lineno,
                 "function": node.name,
                 "explanation": f"Function has {nlines} lines; long functions are harder to test and maintain.",
                 "suggestion": "Consider splitting into smaller functions with single responsibilities.",
@@ -61,98 +78,88 @@ def _check_long_function(node: ast.AST, source: str) -> List[dict]:
 
 # --- Control Flow (§6.2) ---
 
-def _nesting_level(node: ast.AST) -> int:
-    """Max nesting depth under this node (if/for/while/with/try)."""
-    if isinstance(node, (ast.If, ast.For, ast.While, ast.With, ast.Try)):
-        child_max = 0
-        for child in ast.iter_child_nodes(node):
-            child_max = max(child_max, _nesting_level(child))
-        return 1 + child_max
-    return max((_nesting_level(c) for c in ast.iter_child_nodes(node)), default=0)
-
-
-def _check_deep_nesting(node: ast.AST, source: str) -> List[dict]:
-    """Deep nesting levels. Authority: PEP 20, Python Docs."""
-    if not isinstance(node, ast.FunctionDef):
-        return []
-    depth = 0
-    for n in ast.walk(node):
-        if isinstance(n, (ast.If, ast.For, ast.While, ast.With, ast.Try)):
-            d = _nesting_level(n)
-            if d > depth:
-                depth = d
-    if depth > 4:
-        return [
+# Exact-type tables: one dict/set probe per node instead of an isinstance chain (AST classes are never subclassed).
+_NESTING_TYPES = frozenset((ast.If, ast.For, ast.While, ast.With, ast.Try))
+_CYCLO_WEIGHT: Dict[type, Callable[[Any], int]] = {
+    ast.If: lambda n: 1,
+    ast.While: lambda n: 1,
+    ast.For: lambda n: 1,
+    ast.ExceptHandler: lambda n: 1,
+    ast.BoolOp: lambda n: len(n.values) - 1,
+    ast.comprehension: lambda n: 1 + len(n.ifs),
+}
+
+
+@dataclass(slots=True)
+class FunctionMetrics:
+    """Subtree metrics shared by the function-design rules, gathered in one walk per function."""
+
+    cyclo: int  # 1 + decision points
+    max_depth: int  # deepest chain of nested if/for/while/with/try
+
+
+def _function_metrics(node: ast.FunctionDef) -> FunctionMetrics:
+    """One iterative DFS for cyclomatic complexity and nesting depth."""
+    cyclo = 1
+    max_depth = 0
+    stack = [(node, 0)]
+    while stack:
+        n, depth = stack.pop()
+        node_type = type(n)
+        weight = _CYCLO_WEIGHT.get(node_type)
+        if weight is not None:
+            cyclo += weight(n)
+        if node_type in _NESTING_TYPES:
+            depth += 1
+            if depth > max_depth:
+                max_depth = depth
+        stack.extend((c, depth) for c in ast.iter_child_nodes(n))
+    return FunctionMetrics(cyclo=cyclo, max_depth=max_depth)
+
+
+def _check_function_metrics(node: ast.FunctionDef, source: str, in_class: bool) -> List[dict]:
+    """
+    Deep nesting (PEP 20, Python Docs) and high cyclomatic complexity (Clean Code, Effective Python) from one
+    _function_metrics walk. Items name their rule_id, so one registered check reports both rules.
+    """
+    metrics = _function_metrics(node)
+    items: List[dict] = []
+    if metrics.max_depth > 4:
+        items.append(
             {
-                "line": _line(node),
+                "rule_id": "pybp.control.deep_nesting",
+                "line": node.lineno,
                 "function": node.name,
-                "explanation": f"Nesting depth up to {depth} levels; deep nesting reduces readability.",
+                "explanation": f"Nesting depth up to {metrics.max_depth} levels; deep nesting reduces readability.",
                 "suggestion": "Use early returns or extract nested logic into helper functions.",
             }
-        ]
-    return []
-
-
-def _cyclo_complexity(node: ast.AST) -> int:
-    """Cyclomatic complexity: 1 + number of decision points."""
-    total = 1
-    for n in ast.walk(node):
-        if isinstance(n, (ast.If, ast.While, ast.For, ast.ExceptHandler)):
-            total += 1
-        elif isinstance(n, ast.BoolOp):
-            total += len(n.values) - 1
-        elif isinstance(n, ast.comprehension):
-            total += 1
-            if n.ifs:
-                total += len(n.ifs)
-    return total
-
-
-def _check_cyclomatic_complexity(node: ast.AST, source: str) -> List[dict]:
-    """High cyclomatic complexity. Authority: Clean Code, Effective Python."""
-    if not isinstance(node, ast.FunctionDef):
-        return []
-    c = _cyclo_complexity(node)
-    if c > 10:
-        return [
+        )
+    if metrics.cyclo > 10:
+        items.append(
             {
-                "line": _line(node),
+                "rule_id": "pybp.func.cyclomatic_complexity",
+                "line": node.lineno,
                 "function": node.name,
-                "explanation": f"Cyclomatic complexity is {c}; high complexity makes testing and reasoning harder.",
+                "explanation": f"Cyclomatic complexity is {metrics.cyclo}; high complexity makes testing and reasoning harder.",
                 "suggestion": "Simplify conditionals or split into smaller functions.",
             }
-        ]
-    return []
-
-
-def _node_in_class(node: ast.FunctionDef, tree: ast.AST) -> bool:
-    for n in ast.walk(tree):
-        if isinstance(n, ast.ClassDef) and n is not node:
-            for c in ast.walk(n):
-                if c is node:
-                    return True
-    return False
+        )
+    return items
 
 
-def _check_too_many_params(node: ast.AST, source: str) -> List[dict]:
+def _check_too_many_params(node: ast.FunctionDef, source: str, in_class: bool) -> List[dict]:
     """Too many parameters. Authority: Clean Code, Effective Python."""
-    if not isinstance(node, ast.FunctionDef):
-        return []
     nargs = len(node.args.args) + len(node.args.kwonlyargs)
     if node.args.vararg:
         nargs += 1
     if node.args.kwarg:
         nargs += 1
-    try:
-        tree = ast.parse(source)
-        if _node_in_class(node, tree) and node.args.args:
-            nargs -= 1  # exclude self
-    except Exception:
-        pass
+    if in_class and node.args.args:
+        nargs -= 1  # a method: exclude self/cls
     if nargs > 7:
         return [
             {
-                "line": _line(node),
+                "line": node.lineno,
                 "function": node.name,
                 "explanation": f"Function has {nargs} parameters; many parameters complicate the API and call sites.",
                 "suggestion": "Consider an options object, *args/**kwargs for optional args, or splitting responsibilities.",
@@ -161,10 +168,8 @@ def _check_too_many_params(node: ast.AST, source: str) -> List[dict]:
     return []
 
 
-def _check_boolean_flag_args(node: ast.AST, source: str) -> List[dict]:
+def _check_boolean_flag_args(node: ast.FunctionDef, source: str, in_class: bool) -> List[dict]:
     """Boolean flag arguments. Authority: Clean Code."""
-    if not isinstance(node, ast.FunctionDef):
-        return []
     flags: List[str] = []
     for a in node.args.args:
         if isinstance(a, ast.arg) and a.arg and a.arg not in ("self", "cls"):
@@ -181,7 +186,7 @@ def _check_boolean_flag_args(node: ast.AST, source: str) -> List[dict]:
         return []
     return [
         {
-            "line": _line(node),
+            "line": node.lineno,
             "function": node.name,
             "explanation": f"Boolean-like parameter(s): {', '.join(flags)}; flag arguments often indicate two code paths.",
             "suggestion": "Consider splitting into two functions or a small options object.",
@@ -189,10 +194,8 @@ def _check_boolean_flag_args(node: ast.AST, source: str) -> List[dict]:
     ]
 
 
-def _check_else_after_return(node: ast.AST, source: str) -> List[dict]:
+def _check_else_after_return(node: ast.If, source: str, in_class: bool) -> List[dict]:
     """Else after return: if body returns, else is redundant. Authority: PEP 20, Python Docs."""
-    if not isinstance(node, ast.If):
-        return []
     if node.orelse and len(node.orelse) == 1 and isinstance(node.orelse[0], ast.If):
         return []  # elif chain
     last_in_if = node.body[-1] if node.body else None
@@ -200,7 +203,7 @@ def _check_else_after_return(node: ast.AST, source: str) -> List[dict]:
         return []
     return [
         {
-            "line": _line(node.orelse[0]),
+            "line": node.orelse[0].lineno,
             "explanation": "An 'else' block after an 'if' that returns can often be flattened for readability.",
             "suggestion": "Move the else body to the same level as the if; use early return in the if.",
         }
@@ -209,19 +212,36 @@ def _check_else_after_return(node: ast.AST, source: str) -> List[dict]:
 
 # --- Data Structures & Idioms (§6.3) ---
 
-def _check_loop_append_pattern(node: ast.AST, source: str) -> List[dict]:
+_SCOPE_TYPES = (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)
+
+
+def _iter_block_stmts(body: List[ast.stmt]) -> Iterator[ast.stmt]:
+    """
+    Statements of body, breadth-first through nested blocks (if/for/while/with/try/match). Nested
+    functions and classes are their own scope and are skipped, as are all expression subtrees. Loop
+    rules pass loop.body, so the loop's else block (run once) is not included.
+    """
+    todo = deque(body)
+    while todo:
+        node = todo.popleft()
+        if isinstance(node, _SCOPE_TYPES):
+            continue
+        todo.extend(c for c in ast.iter_child_nodes(node) if isinstance(c, STMT_PARENTS))
+        if isinstance(node, ast.stmt):
+            yield node
+
+
+def _check_loop_append_pattern(node: ast.For, source: str, in_class: bool) -> List[dict]:
     """Loop with list.append could be list comprehension. Authority: Python Docs, Real Python."""
-    if not isinstance(node, ast.For):
-        return []
     # Simple heuristic: for x in y: body with body containing list.append(x) or similar
-    for stmt in ast.walk(node):
+    for stmt in _iter_block_stmts(node.body):
         if isinstance(stmt, ast.Expr) and isinstance(stmt.value, ast.Call):
             c = stmt.value
             if isinstance(c.func, ast.Attribute):
                 if c.func.attr == "append" and c.args and isinstance(c.func.value, ast.Name):
                     return [
                         {
-                            "line": _line(node),
+                            "line": node.lineno,
                             "explanation": "Building a list in a loop with .append() can often be a list comprehension.",
                             "suggestion": "Consider a list comprehension [f(x) for x in iterable] if the body is simple.",
                         }
@@ -231,15 +251,13 @@ def _check_loop_append_pattern(node: ast.AST, source: str) -> List[dict]:
 
 # --- OOP (§6.4) ---
 
-def _check_large_class(node: ast.AST, source: str) -> List[dict]:
+def _check_large_class(node: ast.ClassDef, source: str, in_class: bool) -> List[dict]:
     """Class with many methods (god-class signal). Authority: Clean Code, Effective Python."""
-    if not isinstance(node, ast.ClassDef):
-        return []
     methods = [n for n in node.body if isinstance(n, ast.FunctionDef) and not (n.name.startswith("__") and n.name.endswith("__"))]
     if len(methods) > 15:
         return [
             {
-                "line": _line(node),
+                "line": node.lineno,
                 "class_name": node.name,
                 "explanation": f"Class has {len(methods)} public methods; large classes often have too many responsibilities.",
                 "suggestion": "Consider splitting into smaller classes or using composition.",
@@ -250,10 +268,8 @@ def _check_large_class(node: ast.AST, source: str) -> List[dict]:
 
 # --- Module & Package (§6.5) ---
 
-def _check_overloaded_module(node: ast.AST, source: str) -> List[dict]:
+def _check_overloaded_module(node: ast.Module, source: str, in_class: bool) -> List[dict]:
     """Too many top-level definitions. Authority: Cosmic Python, Python Packaging Docs."""
-    if not isinstance(node, ast.Module):
-        return []
     count = sum(1 for n in node.body if isinstance(n, (ast.FunctionDef, ast.ClassDef)))
     if count > 25:
         return [
@@ -266,68 +282,16 @@ def _check_overloaded_module(node: ast.AST, source: str) -> List[dict]:
     return []
 
 
-# --- Error Handling (more §6.6) ---
-
-def _except_has_only_pass(node: ast.ExceptHandler, source: str) -> bool:
-    """True if handler body is effectively empty (pass only)."""
-    if not node.body:
-        return True
-    if len(node.body) == 1 and isinstance(node.body[0], ast.Pass):
-        return True
-    return False
-
-
-def _check_swallow_exception(node: ast.AST, source: str) -> List[dict]:
-    """Swallowing exceptions (except: pass). Authority: Python Docs."""
-    if not isinstance(node, ast.ExceptHandler):
-        return []
-    if node.type is None:
-        return []  # Bare except reported by pybp.error.bare_except
-    if not _except_has_only_pass(node, source):
-        return []
-    return [
-        {
-            "line": _line(node),
-            "explanation": "Exception is caught but not logged or re-raised; failures can be hard to diagnose.",
-            "suggestion": "At least log the exception; consider re-raising or handling specifically.",
-        }
-    ]
-
-
-def _check_broad_exception(node: ast.AST, source: str) -> List[dict]:
-    """Catching Exception only. Authority: Python Docs."""
-    if not isinstance(node, ast.ExceptHandler):
-        return []
-    if node.type is None:
-        return []
-    name = None
-    if isinstance(node.type, ast.Name):
-        name = node.type.id
-    elif isinstance(node.type, ast.Attribute):
-        name = node.type.attr
-    if name == "Exception" and _except_has_only_pass(node, source):
-        return [
-            {
-                "line": _line(node),
-                "explanation": "Catching Exception with no handling can hide bugs; prefer specific exception types.",
-                "suggestion": "Catch specific exceptions (e.g. ValueError, KeyError) or log and re-raise.",
-            }
-        ]
-    return []
-
-
 # --- Performance (§6.7) ---
 
-def _check_string_concat_in_loop(node: ast.AST, source: str) -> List[dict]:
+def _check_string_concat_in_loop(node: ast.For, source: str, in_class: bool) -> List[dict]:
     """Inefficient string concatenation in loop. Authority: Python Docs."""
-    if not isinstance(node, ast.For):
-        return []
-    for n in ast.walk(node):
+    for n in _iter_block_stmts(node.body):
         if isinstance(n, ast.AugAssign) and isinstance(n.op, ast.Add):
             if isinstance(n.target, ast.Name):
                 return [
                     {
-                        "line": _line(n),
+                        "line": n.lineno,
                         "explanation": "Repeated += on a string in a loop allocates many intermediate strings.",
                         "suggestion": "Collect parts in a list and use ''.join(parts) for better performance.",
                     }
@@ -337,16 +301,15 @@ def _check_string_concat_in_loop(node: ast.AST, source: str) -> List[dict]:
 
 # --- Testability (§6.8) ---
 
-def _check_global_assignment(node: ast.AST, source: str) -> List[dict]:
+def _check_global_assignment(node: ast.FunctionDef, source: str, in_class: bool) -> List[dict]:
     """Global state modification. Authority: Clean Architecture, testing best practices."""
-    if not isinstance(node, ast.FunctionDef):
-        return []
-    has_global = any(isinstance(s, ast.Global) for s in node.body)
+    # global may sit in any nested block of this scope; stop at the first one (almost always near the top).
+    has_global = any(isinstance(s, ast.Global) for s in _iter_block_stmts(node.body))
     if not has_global:
         return []
     return [
         {
-            "line": _line(node),
+            "line": node.lineno,
             "function": node.name,
             "explanation": "Function modifies global state; this makes testing and reasoning about behavior harder.",
             "suggestion": "Prefer passing dependencies as arguments or using dependency injection.",
@@ -356,7 +319,7 @@ def _check_global_assignment(node: ast.AST, source: str) -> List[dict]:
 
 # Rule registry: full metadata per spec §5
 PYBP_RULES: List[PybpRule] = [
-    PybpRule(
+    make_rule(
         rule_id="pybp.error.bare_except",
         title="Bare except clause",
         category="Error Handling",
@@ -368,9 +331,10 @@ PYBP_RULES: List[PybpRule] = [
         thresholds=None,
         suggestion="Catch a specific exception type or at least 'except Exception:'.",
         severity="warning",
-        check=_check_bare_except,
+        check=_check_except_handler,
+        node_types=(ast.ExceptHandler,),
     ),
-    PybpRule(
+    make_rule(
         rule_id="pybp.func.excessive_length",
         title="Excessive function length",
         category="Function Design",
@@ -383,8 +347,9 @@ PYBP_RULES: List[PybpRule] = [
         suggestion="Consider splitting into smaller functions with single responsibilities.",
         severity="advisory",
         check=_check_long_function,
+        node_types=(ast.FunctionDef,),
     ),
-    PybpRule(
+    make_rule(
         rule_id="pybp.control.deep_nesting",
         title="Deep nesting",
         category="Control Flow & Readability",
@@ -396,9 +361,10 @@ PYBP_RULES: List[PybpRule] = [
         thresholds="> 4 levels",
         suggestion="Use early returns or extract nested logic into helper functions.",
         severity="advisory",
-        check=_check_deep_nesting,
+        check=_check_function_metrics,
+        node_types=(ast.FunctionDef,),
     ),
-    PybpRule(
+    make_rule(
         rule_id="pybp.func.cyclomatic_complexity",
         title="High cyclomatic complexity",
         category="Function Design",
@@ -410,9 +376,10 @@ PYBP_RULES: List[PybpRule] = [
         thresholds="> 10",
         suggestion="Simplify conditionals or split into smaller functions.",
         severity="advisory",
-        check=_check_cyclomatic_complexity,
+        check=_check_function_metrics,
+        node_types=(ast.FunctionDef,),
     ),
-    PybpRule(
+    make_rule(
         rule_id="pybp.func.too_many_parameters",
         title="Too many parameters",
         category="Function Design",
@@ -425,8 +392,9 @@ PYBP_RULES: List[PybpRule] = [
         suggestion="Consider an options object, *args/**kwargs for optional args, or splitting responsibilities.",
         severity="advisory",
         check=_check_too_many_params,
+        node_types=(ast.FunctionDef,),
     ),
-    PybpRule(
+    make_rule(
         rule_id="pybp.func.boolean_flag",
         title="Boolean flag arguments",
         category="Function Design",
@@ -439,8 +407,9 @@ PYBP_RULES: List[PybpRule] = [
         suggestion="Consider splitting into two functions or a small options object.",
         severity="info",
         check=_check_boolean_flag_args,
+        node_types=(ast.FunctionDef,),
     ),
-    PybpRule(
+    make_rule(
         rule_id="pybp.control.else_after_return",
         title="Else after return",
         category="Control Flow & Readability",
@@ -453,8 +422,9 @@ PYBP_RULES: List[PybpRule] = [
         suggestion="Move the else body to the same level; use early return in the if.",
         severity="info",
         check=_check_else_after_return,
+        node_types=(ast.If,),
     ),
-    PybpRule(
+    make_rule(
         rule_id="pybp.data.loop_append",
         title="List built in loop with .append()",
         category="Data Structures & Idioms",
@@ -467,8 +437,9 @@ PYBP_RULES: List[PybpRule] = [
         suggestion="Consider a list comprehension [f(x) for x in iterable] if the body is simple.",
         severity="info",
         check=_check_loop_append_pattern,
+        node_types=(ast.For,),
     ),
-    PybpRule(
+    make_rule(
         rule_id="pybp.oop.large_class",
         title="Class with many methods",
         category="Object-Oriented Design",
@@ -481,8 +452,9 @@ PYBP_RULES: List[PybpRule] = [
         suggestion="Consider splitting into smaller classes or using composition.",
         severity="advisory",
         check=_check_large_class,
+        node_types=(ast.ClassDef,),
     ),
-    PybpRule(
+    make_rule(
         rule_id="pybp.module.overloaded",
         title="Overloaded module",
         category="Module & Package Structure",
@@ -495,8 +467,9 @@ PYBP_RULES: List[PybpRule] = [
         suggestion="Group related code into submodules or packages.",
         severity="advisory",
         check=_check_overloaded_module,
+        node_types=(ast.Module,),
     ),
-    PybpRule(
+    make_rule(
         rule_id="pybp.error.swallow",
         title="Swallowing exceptions",
         category="Error Handling",
@@ -508,9 +481,10 @@ PYBP_RULES: List[PybpRule] = [
         thresholds=None,
         suggestion="At least log the exception; consider re-raising or handling specifically.",
         severity="warning",
-        check=_check_swallow_exception,
+        check=_check_except_handler,
+        node_types=(ast.ExceptHandler,),
     ),
-    PybpRule(
+    make_rule(
         rule_id="pybp.error.broad_catch",
         title="Overly broad exception catch",
         category="Error Handling",
@@ -522,9 +496,10 @@ PYBP_RULES: List[PybpRule] = [
         thresholds=None,
         suggestion="Catch specific exceptions (e.g. ValueError, KeyError) or log and re-raise.",
         severity="advisory",
-        check=_check_broad_exception,
+        check=_check_except_handler,
+        node_types=(ast.ExceptHandler,),
     ),
-    PybpRule(
+    make_rule(
         rule_id="pybp.perf.string_concat",
         title="String concatenation in loop",
         category="Performance & Scalability",
@@ -537,8 +512,9 @@ PYBP_RULES: List[PybpRule] = [
         suggestion="Collect parts in a list and use ''.join(parts) for better performance.",
         severity="advisory",
         check=_check_string_concat_in_loop,
+        node_types=(ast.For,),
     ),
-    PybpRule(
+    make_rule(
         rule_id="pybp.test.global_state",
         title="Global state modification",
         category="Testability & Maintainability",
@@ -551,5 +527,6 @@ PYBP_RULES: List[PybpRule] = [
         suggestion="Prefer passing dependencies as arguments or using dependency injection.",
         severity="advisory",
         check=_check_global_assignment,
+        node_types=(ast.FunctionDef,),
     ),
 ]
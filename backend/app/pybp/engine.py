@@ -2,52 +2,126 @@
 from __future__ import annotations
 
 import ast
-from typing import List
+from functools import lru_cache
+from itertools import chain
+from typing import Dict, Iterator, List, NamedTuple, Tuple
 
+from app.ast_cache import get_ast
 from app.schemas import PybpAdvisory
-from app.pybp.rules import PybpRule, SEVERITIES
+from app.pybp.checks import PYBP_RULES, STMT_PARENTS
+from app.pybp.rules import SEVERITIES, PybpRule
+
+
+# in_class for the children of a node: a class body is class scope, a function or lambda body is not, and
+# any other node (if/try/with/match blocks included) passes its own context down.
+_CHILD_IN_CLASS = {ast.ClassDef: True, ast.FunctionDef: False, ast.AsyncFunctionDef: False, ast.Lambda: False}
+
+
+def _walk(tree: ast.Module, stmt_only: bool) -> Iterator[Tuple[ast.AST, bool]]:
+    """
+    (node, in_class) for every node of tree, depth-first over a list stack (cheaper than ast.walk's deque
+    and nested generator); in_class is True for nodes in a class's own scope, including nested statement
+    blocks, so methods are known without a separate pass or marks on the shared cached tree. With stmt_only,
+    expression subtrees are never entered. Order is irrelevant: run_pybp sorts its output.
+    """
+    stack: List[Tuple[ast.AST, bool]] = [(tree, False)]
+    while stack:
+        node, in_class = stack.pop()
+        scope = _CHILD_IN_CLASS.get(type(node), in_class)
+        if stmt_only:
+            stack.extend((c, scope) for c in ast.iter_child_nodes(node) if isinstance(c, STMT_PARENTS))
+        else:
+            stack.extend((c, scope) for c in ast.iter_child_nodes(node))
+        yield node, in_class
+
+class _Dispatch(NamedTuple):
+    """
+    A rule list grouped for one walk: tree-level rules, node class -> rules, whether expressions can be
+    skipped, and rule_id -> rule for checks whose items report under another rule's metadata.
+    """
+
+    tree_level: Tuple[PybpRule, ...]
+    by_type: Dict[type, Tuple[PybpRule, ...]]
+    stmt_level: bool
+    by_id: Dict[str, PybpRule]
+
+
+@lru_cache(maxsize=8)
+def _build_dispatch(rules: Tuple[PybpRule, ...]) -> _Dispatch:
+    """
+    Group rules by the node classes they check. Rule sets are fixed per process, so each is built once.
+    Rules with a severity outside SEVERITIES are dropped here, as run_pybp always skipped them: advisories
+    are built with model_construct, and a rule list may hold PybpRule(...) values that skipped make_rule.
+    """
+    rules = tuple(r for r in rules if r.severity in SEVERITIES)
+    # Rules registered only for Module see exactly one node: run them once on the root, outside the walk.
+    tree_level = tuple(r for r in rules if r.node_types == (ast.Module,))
+    by_type: Dict[type, List[PybpRule]] = {}
+    for rule in rules:
+        if rule.node_types != (ast.Module,):
+            for node_type in rule.node_types:
+                registered = by_type.setdefault(node_type, [])
+                # A fused check shared by several rules runs once per node, through whichever of its rules
+                # is listed first; its items name their own rule_id and are filtered through by_id.
+                if all(r.check is not rule.check for r in registered):
+                    registered.append(rule)
+    # Expressions are the bulk of any tree; skip them unless some rule is registered for an expression type.
+    stmt_level = all(issubclass(t, STMT_PARENTS) for t in by_type)
+    by_id = {r.rule_id: r for r in rules}
+    return _Dispatch(tree_level, {t: tuple(rs) for t, rs in by_type.items()}, stmt_level, by_id)
+
+
+# Built at import for the registry every caller passes; other rule lists go through the cache above.
+PYBP_DISPATCH = _build_dispatch(tuple(PYBP_RULES))
 
 
 def run_pybp(source: str, rules: List[PybpRule]) -> List[PybpAdvisory]:
     """
     Run PYBP rules on source. Same input as PEP 8; independent result set.
-    Returns advisories only (severity in info/advisory/warning). No errors.
+    Returns advisories only (severity in info/advisory/warning, enforced once per rule list). No errors.
     """
-    if not source or not source.strip():
-        return []
-    try:
-        tree = ast.parse(source)
-    except SyntaxError:
+    if not source or not source.strip() or not rules:
         return []
-    if not rules:
+    # Same cached tree the analysis engines walk; a repeat or concurrent analysis of source parses once.
+    tree = get_ast(source)
+    if tree is None:
         return []
+    tree_level_rules, dispatch, stmt_level, by_id = PYBP_DISPATCH if rules is PYBP_RULES else _build_dispatch(tuple(rules))
+    triples: Iterator[Tuple[PybpRule, ast.AST, bool]] = (
+        (rule, node, in_class)
+        for node, in_class in _walk(tree, stmt_level)
+        for rule in dispatch.get(type(node), ())
+    )
     advisories: List[PybpAdvisory] = []
-    for rule in rules:
-        for node in ast.walk(tree):
-            for item in rule.check(node, source):
-                if not isinstance(item, dict) or rule.severity not in SEVERITIES:
-                    continue
-                advisories.append(
-                    PybpAdvisory(
-                        rule_id=rule.rule_id,
-                        title=rule.title,
-                        category=rule.category,
-                        line=item.get("line", 1),
-                        function=item.get("function"),
-                        class_name=item.get("class_name"),
-                        explanation=item.get("explanation", rule.description),
-                        authority=rule.authority,
-                        citation=rule.citation,
-                        suggestion=item.get("suggestion", rule.suggestion),
-                        severity=rule.severity,
-                    )
-                )
-    # Dedupe by (rule_id, line); sort by line
+    # Dedupe by (rule_id, line) as advisories are produced, so duplicates never become models.
     seen: set[tuple[str, int]] = set()
-    unique = []
-    for a in sorted(advisories, key=lambda x: (x.line, x.rule_id)):
-        key = (a.rule_id, a.line)
-        if key not in seen:
+    for rule, node, in_class in chain(((r, tree, False) for r in tree_level_rules), triples):
+        # Checks return lists of dicts and severity was validated per rule in _build_dispatch: no per-item guards.
+        for item in rule.check(node, source, in_class):
+            # An item may name its rule_id (fused checks); it is dropped if that rule is not in this run.
+            meta = by_id.get(item["rule_id"]) if "rule_id" in item else rule
+            if meta is None:
+                continue
+            line = item.get("line", 1)
+            key = (meta.rule_id, line)
+            if key in seen:
+                continue
             seen.add(key)
-            unique.append(a)
-    return unique
+            # Fields come from validated rule metadata and the checks' own dicts: skip re-validating them.
+            advisories.append(
+                PybpAdvisory.model_construct(
+                    rule_id=meta.rule_id,
+                    title=meta.title,
+                    category=meta.category,
+                    line=line,
+                    function=item.get("function"),
+                    class_name=item.get("class_name"),
+                    explanation=item.get("explanation", meta.description),
+                    authority=meta.authority,
+                    citation=meta.citation,
+                    suggestion=item.get("suggestion", meta.suggestion),
+                    severity=meta.severity,
+                )
+            )
+    advisories.sort(key=lambda x: (x.line, x.rule_id))
+    return advisories
@@ -1,16 +1,22 @@
 """PYBP rule metadata and registry. All rules have full metadata per spec §5."""
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import Any, Callable, List, Optional
+import sys
+from typing import Any, Callable, List, NamedTuple, Optional, Tuple
 
 # Severity: info | advisory | warning only (§7)
 SEVERITIES = ("info", "advisory", "warning")
 
+# Short metadata that repeats across rules and is compared or hashed per advisory; interned once at load.
+_INTERNED_FIELDS = ("rule_id", "title", "category", "authority", "citation", "severity")
 
-@dataclass(frozen=True)
-class PybpRule:
-    """Metadata for one PYBP rule. No rule without complete metadata (§5)."""
+
+class PybpRule(NamedTuple):
+    """
+    Metadata for one PYBP rule. No rule without complete metadata (§5).
+    A NamedTuple: the engine reads these fields for every rule/node pair, and tuple field access is cheap.
+    Build rules with make_rule, which validates severity.
+    """
 
     rule_id: str
     title: str
@@ -23,8 +29,18 @@ class PybpRule:
     thresholds: Optional[str]
     suggestion: str
     severity: str  # info | advisory | warning
-    check: Callable[[Any, str], List[dict]]  # (ast_node, source) -> list of advisory dicts
+    # (ast_node, source, in_class) -> list of advisory dicts; in_class: node is in class scope (its body or blocks in it).
+    # A dict's "rule_id" overrides the rule it is reported under.
+    check: Callable[[Any, str, bool], List[dict]]
+    node_types: Tuple[type, ...] = ()  # AST node classes check is called for; the engine dispatches on these
+
 
-    def __post_init__(self) -> None:
-        if self.severity not in SEVERITIES:
-            raise ValueError(f"severity must be one of {SEVERITIES}")
+def make_rule(**fields: Any) -> PybpRule:
+    """Create a PybpRule, enforcing the severity contract once at registry load (§7)."""
+    for name in _INTERNED_FIELDS:
+        if isinstance(fields.get(name), str):
+            fields[name] = sys.intern(fields[name])
+    rule = PybpRule(**fields)
+    if rule.severity not in SEVERITIES:
+        raise ValueError(f"severity must be one of {SEVERITIES}")
+    return rule
@@ -1,9 +1,9 @@
 """Request/response schemas for PEP 8 check API and PYBP extension."""
 from __future__ import annotations
 
-from typing import List, Optional
+from typing import Any, List, NamedTuple, Optional, Tuple
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
 
 class CheckRequest(BaseModel):
@@ -45,6 +45,8 @@ class PybpAdvisory(BaseModel):
 class Location(BaseModel):
     """Location of a static analysis finding."""
 
+    model_config = ConfigDict(frozen=True)
+
     line: int = Field(..., ge=1, description="1-based line number")
     column: Optional[int] = Field(None, ge=0)
     function: Optional[str] = None
@@ -52,7 +54,12 @@ class Location(BaseModel):
 
 
 class StaticAnalysisFinding(BaseModel):
-    """Single finding from advanced static analysis (types, dataflow, errors, security, metrics, insights)."""
+    """
+    Single finding from advanced static analysis (types, dataflow, errors, security, metrics, insights).
+    Frozen: engines memoize findings per source and hand the same objects to every caller.
+    """
+
+    model_config = ConfigDict(frozen=True)
 
     domain: str = Field(..., description="Analysis domain e.g. types, dataflow, security")
     rule_id: str = Field(..., description="Stable rule id")
@@ -63,6 +70,34 @@ class StaticAnalysisFinding(BaseModel):
     suggestion: str = Field(..., description="How to improve")
 
 
+class RawFinding(NamedTuple):
+    """
+    Unvalidated finding used inside the analysis engines; converted to StaticAnalysisFinding once, after dedupe.
+    explanation may be a str.format template filled from args at conversion, so dropped duplicates never format.
+    """
+
+    domain: str
+    rule_id: str
+    title: str
+    line: int
+    severity: str
+    explanation: str
+    suggestion: str
+    function: Optional[str] = None
+    args: Tuple[Any, ...] = ()
+
+    def to_finding(self) -> StaticAnalysisFinding:
+        return StaticAnalysisFinding(
+            domain=self.domain,
+            rule_id=self.rule_id,
+            title=self.title,
+            location=Location(line=self.line, function=self.function),
+            severity=self.severity,
+            explanation=self.explanation.format(*self.args) if self.args else self.explanation,
+            suggestion=self.suggestion,
+        )
+
+
 class CheckResponse(BaseModel):
     """Response from POST /api/check. PEP 8 issues + optional PYBP advisories + optional static analysis findings."""
 
@@ -2,16 +2,16 @@
 """
 Detect changes to the official PEP 8 document and report impacted rules.
 Run from backend dir: python scripts/detect_pep8_changes.py [--accept]
-Requires: pip install -r requirements.txt (requests, beautifulsoup4)
+Requires: pip install -r requirements.txt (requests, selectolax)
 """
 from __future__ import annotations
 
 import argparse
-import hashlib
-import json
+import os
 import re
 import sys
 from datetime import datetime
+from hashlib import sha256
 from pathlib import Path
 
 # Run from backend/ so app is importable
@@ -19,50 +19,88 @@ BACKEND_ROOT = Path(__file__).resolve().parent.parent
 if str(BACKEND_ROOT) not in sys.path:
     sys.path.insert(0, str(BACKEND_ROOT))
 
+import orjson
 import requests
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from selectolax.lexbor import LexborHTMLParser, LexborNode
 
 from app.pep8_map import PEP8_URL, get_section_fragment_to_codes, get_tracked_section_fragments
 
 BASELINE_PATH = BACKEND_ROOT / "data" / "pep8_baseline.json"
 
-
-def fetch_pep8_html() -> str:
-    r = requests.get(PEP8_URL, timeout=30)
+_WS_RE = re.compile(r"\s+")
+
+# One pooled session: repeated fetches (retries, more documents) reuse the TLS connection.
+_SESSION = requests.Session()
+_SESSION.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=4))
+
+
+def fetch_pep8_html(baseline: dict | None = None) -> tuple[bytes | None, dict]:
+    """
+    Fetch the PEP 8 page. With a baseline that recorded validators, the GET is conditional; returns
+    (None, {}) on 304 Not Modified. Otherwise returns (html, {"etag": ..., "last_modified": ...}).
+    """
+    headers = {}
+    if baseline:
+        if baseline.get("etag"):
+            headers["If-None-Match"] = baseline["etag"]
+        if baseline.get("last_modified"):
+            headers["If-Modified-Since"] = baseline["last_modified"]
+    # requests already sends Accept-Encoding: gzip, deflate and decodes the body transparently.
+    r = _SESSION.get(PEP8_URL, timeout=30, headers=headers)
+    if r.status_code == 304:
+        return None, {}
     r.raise_for_status()
-    return r.text
+    # Raw UTF-8 body straight to the parser: no decoded str copy that the parser would re-encode.
+    return r.content, {"etag": r.headers.get("ETag"), "last_modified": r.headers.get("Last-Modified")}
+
+
+def _node_text(node: LexborNode) -> str:
+    return node.text(deep=True, separator=" ", strip=True)
+
+
+def build_id_index(tree: LexborHTMLParser) -> dict[str, LexborNode]:
+    """Map each id to its first element, in one pass over the document."""
+    index: dict[str, LexborNode] = {}
+    for node in tree.css("[id]"):
+        index.setdefault(node.attributes.get("id"), node)
+    return index
 
 
-def extract_section_text(soup: BeautifulSoup, section_id: str) -> str:
+def extract_section_text(id_index: dict[str, LexborNode], section_id: str) -> str:
     """Get normalized text content of the section with id=section_id."""
-    el = soup.find(id=section_id)
-    if not el:
+    el = id_index.get(section_id)
+    if el is None:
         return ""
-    # Include following siblings until next heading with id
-    parts = [el.get_text(separator=" ", strip=True)]
-    for sib in el.find_next_siblings():
-        if sib.name in ("h1", "h2", "h3", "h4") and sib.get("id"):
-            break
-        parts.append(sib.get_text(separator=" ", strip=True))
+    # Include following element siblings until next heading with id (text and comment nodes are skipped)
+    parts = [_node_text(el)]
+    sib = el.next
+    while sib is not None:
+        if sib.tag[:1].isalpha():
+            if sib.tag in ("h1", "h2", "h3", "h4") and sib.attributes.get("id"):
+                break
+            parts.append(_node_text(sib))
+        sib = sib.next
     text = " ".join(parts)
-    return re.sub(r"\s+", " ", text).strip()
+    return _WS_RE.sub(" ", text).strip()
 
 
 def hash_text(text: str) -> str:
-    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+    return sha256(text.encode("utf-8")).hexdigest()
 
 
 def load_baseline() -> dict | None:
     if not BASELINE_PATH.exists():
         return None
-    with open(BASELINE_PATH, encoding="utf-8") as f:
-        return json.load(f)
+    return orjson.loads(BASELINE_PATH.read_bytes())
 
 
 def save_baseline(data: dict) -> None:
     BASELINE_PATH.parent.mkdir(parents=True, exist_ok=True)
-    with open(BASELINE_PATH, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2)
+    # Write a sibling temp file, then rename over the baseline: an interrupted run never leaves it half-written.
+    tmp = BASELINE_PATH.with_suffix(".json.tmp")
+    tmp.write_bytes(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+    os.replace(tmp, BASELINE_PATH)
 
 
 def main() -> int:
@@ -73,19 +111,25 @@ def main() -> int:
     fragments = get_tracked_section_fragments()
     fragment_to_codes = get_section_fragment_to_codes()
 
+    baseline = load_baseline()
+    # A conditional GET is only safe when the baseline already hashes every tracked section.
+    conditional = baseline if baseline and set(fragments) <= set(baseline.get("sections", {})) else None
     try:
-        html = fetch_pep8_html()
+        html, validators = fetch_pep8_html(conditional)
     except requests.RequestException as e:
         print(f"Failed to fetch {PEP8_URL}: {e}", file=sys.stderr)
         return 1
+    if html is None:
+        print("No PEP 8 section changes detected (page not modified since baseline).")
+        return 0
 
-    soup = BeautifulSoup(html, "html.parser")
-    current = {"revision_date": datetime.utcnow().strftime("%Y-%m-%d"), "sections": {}}
+    # selectolax's lexbor backend parses in C and never builds a Python object per element.
+    id_index = build_id_index(LexborHTMLParser(html))
+    current = {"revision_date": datetime.utcnow().strftime("%Y-%m-%d"), **validators, "sections": {}}
     for frag in fragments:
-        text = extract_section_text(soup, frag)
+        text = extract_section_text(id_index, frag)
         current["sections"][frag] = hash_text(text) if text else ""
 
-    baseline = load_baseline()
     if not baseline:
         print("No baseline found. Run with --accept to create one.")
         if args.accept:
@@ -93,13 +137,8 @@ def main() -> int:
             print("Baseline created at data/pep8_baseline.json")
         return 0
 
-    changed = []
-    for frag in fragments:
-        old_h = baseline.get("sections", {}).get(frag)
-        new_h = current["sections"].get(frag)
-        if old_h != new_h:
-            codes = fragment_to_codes.get(frag, [])
-            changed.append((frag, codes))
+    old, new = baseline.get("sections", {}), current["sections"]
+    changed = [(frag, fragment_to_codes.get(frag, ())) for frag in fragments if old.get(frag) != new[frag]]
 
     if not changed:
         print("No PEP 8 section changes detected.")
@@ -1,13 +1,37 @@
 """Shared pytest fixtures and helpers for analysis engine tests."""
 from __future__ import annotations
 
-from typing import Optional
+from collections import defaultdict
+from typing import DefaultDict, Iterable, List, Optional
+
+import pytest
+
+from app.analysis import run_all, run_security, run_types
+
+# Passes the security/types trigger pre-filters, so warming really parses and walks.
+_WARM_SNIPPET = "from typing import Any\ndef f(x: Any) -> Any:\n    return eval(x)\n"
+
+
+@pytest.fixture(scope="session", autouse=True)
+def _warm_engines():
+    """Pay one-time first-call costs (parser, pipeline dispatch, pydantic validators) before any test runs."""
+    run_all(_WARM_SNIPPET)
+    run_security(_WARM_SNIPPET)
+    run_types(_WARM_SNIPPET)
+
+
+def group(findings: Iterable) -> DefaultDict[str, List]:
+    """Bucket findings by rule_id in one pass; a rule with no findings maps to []."""
+    by_rule: DefaultDict[str, List] = defaultdict(list)
+    for f in findings:
+        by_rule[f.rule_id].append(f)
+    return by_rule
 
 
 def assert_finding(finding, domain: str, rule_id: str, line: Optional[int] = None, title_substr: Optional[str] = None):
     """Assert a finding has expected domain, rule_id, and optionally line/title."""
-    assert finding.domain == domain, f"expected domain {domain!r}, got {finding.domain!r}"
-    assert finding.rule_id == rule_id, f"expected rule_id {rule_id!r}, got {finding.rule_id!r}"
+    got = (finding.domain, finding.rule_id)
+    assert got == (domain, rule_id), f"expected (domain, rule_id) {(domain, rule_id)!r}, got {got!r}"
     if line is not None:
         assert finding.location.line == line, f"expected line {line}, got {finding.location.line}"
     if title_substr is not None:
@@ -4,7 +4,7 @@ from __future__ import annotations
 import pytest
 
 from app.analysis.dataflow import run_dataflow
-from tests.conftest import assert_finding
+from tests.conftest import assert_finding, group
 
 
 class TestDataflowEdgeCases:
@@ -71,7 +71,7 @@ def greet():
 """
         findings = run_dataflow(code)
         assert len(findings) >= 1
-        shadow = [f for f in findings if f.rule_id == "dataflow.shadowing"]
+        shadow = group(findings)["dataflow.shadowing"]
         assert len(shadow) == 1
         assert_finding(shadow[0], "dataflow", "dataflow.shadowing", line=4, title_substr="shadowing")
         assert "name" in shadow[0].explanation
@@ -86,11 +86,25 @@ def f():
     return a + b
 """
         findings = run_dataflow(code)
-        shadow = [f for f in findings if f.rule_id == "dataflow.shadowing"]
+        shadow = group(findings)["dataflow.shadowing"]
         assert len(shadow) == 2
         lines = [f.location.line for f in shadow]
         assert 5 in lines and 6 in lines
 
+    def test_nested_function_shadowing_reported_once_for_inner(self):
+        code = """
+x = 0
+def outer():
+    def inner():
+        x = 1
+        return x
+    return inner
+"""
+        findings = run_dataflow(code)
+        assert len(findings) == 1
+        assert_finding(findings[0], "dataflow", "dataflow.shadowing", line=5)
+        assert findings[0].location.function == "inner"
+
     def test_domain_and_severity(self):
         code = """
 x = 0
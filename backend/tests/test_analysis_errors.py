@@ -4,7 +4,7 @@ from __future__ import annotations
 import pytest
 
 from app.analysis.errors import run_errors
-from tests.conftest import assert_finding
+from tests.conftest import assert_finding, group
 
 
 class TestErrorsEdgeCases:
@@ -49,7 +49,7 @@ except Exception:
     raise
 """
         findings = run_errors(code)
-        silent = [f for f in findings if f.rule_id == "errors.silent_catch"]
+        silent = group(findings)["errors.silent_catch"]
         assert len(silent) == 0
 
 
@@ -64,7 +64,7 @@ except:
     pass
 """
         findings = run_errors(code)
-        bare = [f for f in findings if f.rule_id == "errors.bare_except"]
+        bare = group(findings)["errors.bare_except"]
         assert len(bare) == 1
         assert_finding(bare[0], "errors", "errors.bare_except", title_substr="Bare")
         assert bare[0].severity == "warning"
@@ -77,7 +77,7 @@ except Exception:
     pass
 """
         findings = run_errors(code)
-        caught = [f for f in findings if f.rule_id == "errors.caught_and_ignored"]
+        caught = group(findings)["errors.caught_and_ignored"]
         assert len(caught) >= 1
         assert_finding(caught[0], "errors", "errors.caught_and_ignored", title_substr="ignored")
 
@@ -89,7 +89,7 @@ except ValueError:
     pass
 """
         findings = run_errors(code)
-        silent = [f for f in findings if f.rule_id == "errors.silent_catch"]
+        silent = group(findings)["errors.silent_catch"]
         assert len(silent) == 1
         assert_finding(silent[0], "errors", "errors.silent_catch", title_substr="Silent")
 
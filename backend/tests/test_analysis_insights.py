@@ -5,7 +5,7 @@ import pytest
 
 from app.schemas import Location, StaticAnalysisFinding
 from app.analysis.insights import run_insights
-from tests.conftest import assert_finding
+from tests.conftest import assert_finding, group
 
 
 def _finding(domain: str, rule_id: str, explanation: str = "") -> StaticAnalysisFinding:
@@ -33,7 +33,7 @@ class TestInsightsEdgeCases:
     def test_one_security_finding_no_elevated_risk(self):
         findings = [_finding("security", "security.dangerous_eval")]
         result = run_insights("code", findings)
-        elevated = [f for f in result if f.rule_id == "insights.elevated_risk"]
+        elevated = group(result)["insights.elevated_risk"]
         assert len(elevated) == 0
 
 
@@ -46,7 +46,7 @@ class TestInsightsPositive:
             _finding("security", "security.unsafe_deserialization"),
         ]
         result = run_insights("code", findings)
-        elevated = [f for f in result if f.rule_id == "insights.elevated_risk"]
+        elevated = group(result)["insights.elevated_risk"]
         assert len(elevated) == 1
         assert_finding(elevated[0], "insights", "insights.elevated_risk", title_substr="risk")
         assert "2" in elevated[0].explanation or "Multiple" in elevated[0].explanation
@@ -58,7 +58,7 @@ class TestInsightsPositive:
             _finding("security", "c"),
         ]
         result = run_insights("code", findings)
-        elevated = [f for f in result if f.rule_id == "insights.elevated_risk"]
+        elevated = group(result)["insights.elevated_risk"]
         assert len(elevated) == 1
         assert "3" in elevated[0].explanation
 
@@ -71,7 +71,7 @@ class TestInsightsPositive:
             ),
         ]
         result = run_insights("code", findings)
-        complexity_insight = [f for f in result if f.rule_id == "insights.complexity_context"]
+        complexity_insight = group(result)["insights.complexity_context"]
         assert len(complexity_insight) == 1
         assert_finding(complexity_insight[0], "insights", "insights.complexity_context", title_substr="Complexity")
 
@@ -80,7 +80,7 @@ class TestInsightsPositive:
             _finding("metrics", "metrics.complexity", explanation="Only cyclo."),
         ]
         result = run_insights("code", findings)
-        complexity_insight = [f for f in result if f.rule_id == "insights.complexity_context"]
+        complexity_insight = group(result)["insights.complexity_context"]
         assert len(complexity_insight) == 0
 
     def test_both_elevated_risk_and_complexity_context_can_appear(self):
@@ -1,10 +1,23 @@
 """Integration tests: all engines together, ordering, and API contract."""
 from __future__ import annotations
 
+import ast
+
 import pytest
 from fastapi.testclient import TestClient
 
-from app.analysis import run_types, run_dataflow, run_errors, run_security, run_metrics, run_insights
+from app.ast_cache import get_ast
+from app.analysis import (
+    RULE_SETS,
+    run_all,
+    run_pipeline,
+    run_types,
+    run_dataflow,
+    run_errors,
+    run_security,
+    run_metrics,
+    run_insights,
+)
 from app.main import app
 
 
@@ -23,11 +36,12 @@ def f(x: Any) -> Any:
         pass
     return x
 """
-        types_f = run_types(code)
-        dataflow_f = run_dataflow(code)
-        errors_f = run_errors(code)
-        security_f = run_security(code)
-        metrics_f = run_metrics(code)
+        tree = ast.parse(code)
+        types_f = run_types(code, tree)
+        dataflow_f = run_dataflow(code, tree)
+        errors_f = run_errors(code, tree)
+        security_f = run_security(code, tree)
+        metrics_f = run_metrics(code, tree)
         all_before_insights = types_f + dataflow_f + errors_f + security_f + metrics_f
         insights_f = run_insights(code, all_before_insights)
 
@@ -46,6 +60,49 @@ def f(x: Any) -> Any:
         assert "metrics" in domains
         assert "insights" in domains
 
+    def test_single_pass_pipeline_matches_individual_engines(self):
+        code = """
+from typing import Any
+name = "global"
+def f(x: Any) -> Any:
+    name = "local"
+    try:
+        eval("x")
+    except:
+        pass
+    return x
+"""
+        by_domain = run_pipeline(code, RULE_SETS)
+        assert by_domain["types"] == run_types(code)
+        assert by_domain["dataflow"] == run_dataflow(code)
+        assert by_domain["errors"] == run_errors(code)
+        assert by_domain["security"] == run_security(code)
+        assert by_domain["metrics"] == run_metrics(code)
+
+    def test_pipeline_invalid_syntax_returns_empty_per_domain(self):
+        by_domain = run_pipeline("def (", RULE_SETS)
+        assert by_domain == {rs.domain: [] for rs in RULE_SETS}
+
+    def test_run_all_selects_domains_in_authority_order(self):
+        code = "import os\ndef f(x):\n    os.system(x)\n"
+        assert list(run_all(code)) == [rs.domain for rs in RULE_SETS]
+        subset = run_all(code, ["metrics", "security"])
+        assert list(subset) == ["security", "metrics"]
+        assert subset["security"] == run_security(code)
+        assert run_all("   \n", ["types"]) == {"types": []}
+
+    def test_parse_is_shared_across_engines(self):
+        code = "def f(x):\n    return x\n"
+        assert get_ast(code) is get_ast(code)
+        assert get_ast("def (") is None
+
+    def test_engines_accept_a_preparsed_tree(self):
+        code = "import os\nname = 'x'\ndef f(x: Any) -> Any:\n    name = 'y'\n    os.system(x)\n"
+        tree = ast.parse(code)
+        assert run_all(code, tree=tree) == run_all(code)
+        assert run_security(code, tree) == run_security(code)
+        assert run_dataflow(code, tree) == run_dataflow(code)
+
     def test_findings_have_required_schema_fields(self):
         code = "def g() -> None: pass"
         metrics_f = run_metrics(code)
@@ -79,9 +136,11 @@ def add(a: int, b: int) -> int:
 class TestApiCheckWithFindings:
     """POST /api/check returns findings when advanced is enabled."""
 
-    @pytest.fixture
+    @pytest.fixture(scope="module")
     def client(self):
-        return TestClient(app)
+        # One client (and one lifespan startup/warmup) for every API test in this module.
+        with TestClient(app) as c:
+            yield c
 
     def test_check_returns_findings_key(self, client):
         r = client.post("/api/check", json={"code": "x = 1"})
@@ -107,6 +166,53 @@ class TestApiCheckWithFindings:
         security = [f for f in findings if f.get("domain") == "security"]
         assert len(security) >= 2
 
+    def test_check_combines_pep8_pybp_and_findings(self, client):
+        r = client.post(
+            "/api/check",
+            json={"code": "try:\n    x=1\nexcept:\n    pass\n"},
+        )
+        assert r.status_code == 200
+        data = r.json()
+        assert data["ok"] is True
+        assert any(i["code"] == "E225" for i in data["issues"])
+        assert any(a["rule_id"] == "pybp.error.bare_except" for a in data["advisories"])
+        assert any(f["rule_id"] == "errors.bare_except" for f in data["findings"])
+
+    def test_pep8_line_numbers_ignore_form_feed(self, client):
+        r = client.post("/api/check", json={"code": "x = 1\x0c\ny=2\n", "pybp_enabled": False})
+        assert r.status_code == 200
+        e225 = [i for i in r.json()["issues"] if i["code"] == "E225"]
+        assert [i["line"] for i in e225] == [2]
+
+    @pytest.mark.parametrize(
+        "code",
+        [
+            "import os, sys\nx=1 \nif x :\n\ty = [1,2]\nz = 'x' * 100 + 'yyyyyyyyyyyyyyyyyyyyyyyyyyyyyyyyyyyyyyyyyyyyyyyyyyyyyyyyyyyyyyyyyy'\n\n\n\n",
+            "def f( a ):\n  return a==1 ;\nclass C: pass\nl = lambda: 0\n#bad comment\n",
+            "def f(:\n    pass\n",
+        ],
+    )
+    def test_pep8_messages_have_no_code_prefix_or_padding(self, client, code):
+        r = client.post("/api/check", json={"code": code, "pybp_enabled": False})
+        issues = r.json()["issues"]
+        assert issues
+        for issue in issues:
+            assert issue["message"] and issue["message"] == issue["message"].strip()
+            assert not issue["message"].startswith(issue["code"])
+
+    def test_repeated_check_is_cached_per_flag_set(self, client):
+        code = "eval('1')\ny=2\n"
+        first = client.post("/api/check", json={"code": code}).json()
+        assert client.post("/api/check", json={"code": code}).json() == first
+        no_pep8 = client.post("/api/check", json={"code": code, "enable_pep8": False}).json()
+        assert first["issues"] and no_pep8["issues"] == []
+        assert no_pep8["findings"] == first["findings"]
+
+    def test_large_responses_are_gzipped(self, client):
+        r = client.post("/api/check", json={"code": "x=1\n" * 50}, headers={"Accept-Encoding": "gzip"})
+        assert r.headers.get("content-encoding") == "gzip"
+        assert len(r.json()["issues"]) == 50
+
     def test_check_with_advanced_disabled_returns_empty_findings(self, client):
         r = client.post(
             "/api/check",
@@ -95,6 +95,20 @@ def deep():
         assert "nesting" in findings[0].explanation.lower()
         assert "depth" in findings[0].explanation.lower()
 
+    def test_exact_complexity_and_depth_values(self):
+        code = """
+def scored(items):
+    for x in items:
+        if x and x > 0:
+            while x:
+                x -= 1
+    return [y for y in items if y]
+"""
+        findings = run_metrics(code)
+        assert len(findings) == 1
+        assert "Cyclomatic complexity: 7;" in findings[0].explanation
+        assert "max nesting depth: 3." in findings[0].explanation
+
     def test_class_methods_each_reported(self):
         code = """
 class C:
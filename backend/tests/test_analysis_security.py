@@ -2,9 +2,21 @@
 from __future__ import annotations
 
 import pytest
+from pydantic import ValidationError
 
 from app.analysis.security import run_security
-from tests.conftest import assert_finding
+from tests.conftest import assert_finding, group
+
+
+# Single-rule snippets: name -> (code, rule_id, exact count or None for "at least one", title substring).
+TRIGGERS = {
+    "eval": ("x = eval('1+1')", "security.dangerous_eval", 1, "eval"),
+    "exec": ("exec('print(1)')", "security.dangerous_eval", 1, None),
+    "pickle_loads": ("import pickle\ndata = pickle.loads(buf)\n", "security.unsafe_deserialization", 1, "pickle"),
+    "os_system": ('import os\nos.system("ls")\n', "security.shell_exec", 1, "Shell"),
+    "subprocess_shell": ('import subprocess\nsubprocess.call("ls", shell=True)\n', "security.shell_exec", None, None),
+    "api_key": ('api_key = "sk-xxxx"', "security.hardcoded_credential", None, None),
+}
 
 
 class TestSecurityEdgeCases:
@@ -19,6 +31,21 @@ class TestSecurityEdgeCases:
     def test_invalid_syntax_returns_empty(self):
         assert run_security("eval(") == []
 
+    def test_repeat_call_returns_a_fresh_list(self):
+        code = "x = eval('1+1')"
+        first = run_security(code)
+        first.clear()
+        assert len(run_security(code)) == 1
+
+    def test_cached_findings_are_frozen(self):
+        finding = run_security("x = eval('1+1')")[0]
+        with pytest.raises(ValidationError):
+            finding.severity = "warning"
+
+    def test_non_ascii_spelling_still_triggers(self):
+        # Identifiers are NFKC-normalized: fullwidth "ｅval" is eval, though the text never contains "eval".
+        assert [f.rule_id for f in run_security('ｅval("1")')] == ["security.dangerous_eval"]
+
     def test_safe_code_only_returns_empty(self):
         code = """
 def add(a, b):
@@ -51,73 +78,63 @@ import subprocess
 subprocess.run(["ls", "-la"])
 """
         findings = run_security(code)
-        shell = [f for f in findings if f.rule_id == "security.shell_exec"]
+        shell = group(findings)["security.shell_exec"]
         assert len(shell) == 0
 
     def test_password_in_comment_not_credential(self):
         code = "# password was reset by user"
         findings = run_security(code)
-        cred = [f for f in findings if f.rule_id == "security.hardcoded_credential"]
+        cred = group(findings)["security.hardcoded_credential"]
         assert len(cred) == 0
 
 
 class TestSecurityPositive:
     """Valid code that triggers security findings."""
 
-    def test_eval_triggered(self):
-        code = "x = eval('1+1')"
-        findings = run_security(code)
-        ev = [f for f in findings if f.rule_id == "security.dangerous_eval"]
-        assert len(ev) == 1
-        assert_finding(ev[0], "security", "security.dangerous_eval", title_substr="eval")
-
-    def test_exec_triggered(self):
-        code = "exec('print(1)')"
-        findings = run_security(code)
-        ex = [f for f in findings if f.rule_id == "security.dangerous_eval"]
-        assert len(ex) == 1
-
-    def test_pickle_loads_triggered(self):
-        code = """
-import pickle
-data = pickle.loads(buf)
-"""
-        findings = run_security(code)
-        pk = [f for f in findings if f.rule_id == "security.unsafe_deserialization"]
-        assert len(pk) == 1
-        assert_finding(pk[0], "security", "security.unsafe_deserialization", title_substr="pickle")
-
-    def test_os_system_triggered(self):
-        code = """
-import os
-os.system("ls")
-"""
-        findings = run_security(code)
-        shell = [f for f in findings if f.rule_id == "security.shell_exec"]
-        assert len(shell) == 1
-        assert_finding(shell[0], "security", "security.shell_exec", title_substr="Shell")
-
-    def test_subprocess_call_triggered(self):
-        code = """
-import subprocess
-subprocess.call("ls", shell=True)
-"""
-        findings = run_security(code)
-        shell = [f for f in findings if f.rule_id == "security.shell_exec"]
-        assert len(shell) >= 1
+    @pytest.mark.parametrize("key", list(TRIGGERS))
+    def test_rule_triggered(self, key):
+        code, rule_id, count, title_substr = TRIGGERS[key]
+        matched = group(run_security(code))[rule_id]
+        if count is None:
+            assert len(matched) >= 1
+        else:
+            assert len(matched) == count
+        assert_finding(matched[0], "security", rule_id, title_substr=title_substr)
 
     def test_hardcoded_password_triggered(self):
         code = 'password = "secret123"'
         findings = run_security(code)
-        cred = [f for f in findings if f.rule_id == "security.hardcoded_credential"]
+        cred = group(findings)["security.hardcoded_credential"]
         assert len(cred) >= 1
         assert any("password" in f.title.lower() or "Hard-coded" in f.title for f in cred)
 
-    def test_hardcoded_api_key_triggered(self):
-        code = 'api_key = "sk-xxxx"'
+    def test_credentials_reported_per_line_with_title(self):
+        code = 'x = 1\nAPI_KEY = "k"\n\nsecret = "s"; pwd = "p"\n'
         findings = run_security(code)
-        cred = [f for f in findings if f.rule_id == "security.hardcoded_credential"]
-        assert len(cred) >= 1
+        cred = group(findings)["security.hardcoded_credential"]
+        assert [(f.location.line, f.title) for f in cred] == [
+            (2, "Hard-coded API key"),
+            (4, "Hard-coded password"),
+        ]
+
+    def test_credential_title_follows_kind_priority_not_match_order(self):
+        # The secret match swallows the quoted password assignment; the title still says password.
+        code = 'x = 1  # secret = \'password = "p"\'\n'
+        cred = group(run_security(code))["security.hardcoded_credential"]
+        assert [(f.location.line, f.title) for f in cred] == [(1, "Hard-coded password")]
+
+    def test_credential_lines_count_cr_and_crlf_breaks(self):
+        code = 'x = 1\rpassword = "p"\r\n\rsecret = "s"\n'
+        cred = group(run_security(code))["security.hardcoded_credential"]
+        assert [(f.location.line, f.title) for f in cred] == [
+            (2, "Hard-coded password"),
+            (4, "Hard-coded secret"),
+        ]
+
+    def test_credential_pattern_does_not_span_lines(self):
+        code = 'password =\n"x"'
+        findings = run_security(code)
+        assert not any(f.rule_id == "security.hardcoded_credential" for f in findings)
 
     def test_multiple_security_findings(self):
         code = """
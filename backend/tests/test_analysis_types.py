@@ -4,7 +4,7 @@ from __future__ import annotations
 import pytest
 
 from app.analysis.types import run_types
-from tests.conftest import assert_finding
+from tests.conftest import assert_finding, group
 
 
 class TestTypesEdgeCases:
@@ -61,29 +61,20 @@ def process(items: list[str], count: int) -> bool:
 class TestTypesPositive:
     """Valid code that must trigger type findings."""
 
-    def test_return_any_triggered(self):
-        code = """
-from typing import Any
-def get_data() -> Any:
-    return {}
-"""
-        findings = run_types(code)
-        assert len(findings) >= 1
-        return_any = [f for f in findings if f.rule_id == "types.return_any"]
-        assert len(return_any) == 1
-        assert_finding(return_any[0], "types", "types.return_any", title_substr="Any")
-
-    def test_param_any_triggered(self):
-        code = """
-from typing import Any
-def handle(value: Any) -> str:
-    return str(value)
-"""
+    @pytest.mark.parametrize(
+        "code, rule_id",
+        [
+            ("from typing import Any\ndef get_data() -> Any:\n    return {}\n", "types.return_any"),
+            ("from typing import Any\ndef handle(value: Any) -> str:\n    return str(value)\n", "types.param_any"),
+        ],
+        ids=["return_any", "param_any"],
+    )
+    def test_single_any_triggered(self, code, rule_id):
         findings = run_types(code)
         assert len(findings) >= 1
-        param_any = [f for f in findings if f.rule_id == "types.param_any"]
-        assert len(param_any) == 1
-        assert_finding(param_any[0], "types", "types.param_any", title_substr="Any")
+        matched = group(findings)[rule_id]
+        assert len(matched) == 1
+        assert_finding(matched[0], "types", rule_id, title_substr="Any")
 
     def test_both_return_and_param_any(self):
         code = """
@@ -104,7 +95,7 @@ def f(a: Any, b: Any) -> None:
     pass
 """
         findings = run_types(code)
-        param_any = [f for f in findings if f.rule_id == "types.param_any"]
+        param_any = group(findings)["types.param_any"]
         # Dedupe is by (rule_id, line); both params on same line => 1 finding
         assert len(param_any) >= 1
         assert any("Any" in f.title or "Parameter" in f.title for f in param_any)
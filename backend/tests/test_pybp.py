@@ -0,0 +1,187 @@
+"""Unit tests for the PYBP best-practice engine."""
+from __future__ import annotations
+
+from app.ast_cache import get_ast
+from app.pybp.checks import PYBP_RULES
+from app.pybp.engine import run_pybp
+
+
+def _rule_ids(code: str):
+    return [a.rule_id for a in run_pybp(code, PYBP_RULES)]
+
+
+class TestPybpFunctionDesign:
+    """Function-level rules: parameter counting, nesting and complexity."""
+
+    def test_method_self_not_counted_as_parameter(self):
+        code = """
+class C:
+    def m(self, a, b, c, d, e, f, g):
+        return a
+"""
+        assert "pybp.func.too_many_parameters" not in _rule_ids(code)
+
+    def test_method_in_conditional_class_block_is_a_method(self):
+        code = """
+class A:
+    if X:
+        def m(self, a, b, c, d, e, f, g):
+            return a
+    else:
+        try:
+            def n(self, a, b, c, d, e, f, g):
+                return a
+        except ImportError:
+            pass
+"""
+        assert "pybp.func.too_many_parameters" not in _rule_ids(code)
+
+    def test_function_nested_in_method_is_not_a_method(self):
+        code = """
+class A:
+    def m(self):
+        if self:
+            def helper(a, b, c, d, e, f, g, h):
+                return a
+        return helper
+"""
+        advisories = [a for a in run_pybp(code, PYBP_RULES) if a.rule_id == "pybp.func.too_many_parameters"]
+        assert [(a.function, a.line) for a in advisories] == [("helper", 5)]
+
+    def test_function_with_eight_parameters_flagged(self):
+        code = """
+def f(a, b, c, d, e, f, g, h):
+    return a
+"""
+        advisories = [a for a in run_pybp(code, PYBP_RULES) if a.rule_id == "pybp.func.too_many_parameters"]
+        assert len(advisories) == 1
+        assert advisories[0].function == "f"
+        assert "8 parameters" in advisories[0].explanation
+
+    def test_shared_cached_tree_is_not_marked(self):
+        code = "class C:\n    def m(self, a):\n        return a\n"
+        run_pybp(code, PYBP_RULES)
+        method = get_ast(code).body[0].body[0]
+        assert not [k for k in vars(method) if k not in method._fields and k not in method._attributes]
+
+
+    def test_complexity_and_nesting_reported_by_one_check(self):
+        branches = "".join(f"    if a == {i}:\n        return {i}\n" for i in range(10))
+        nested = """
+    for x in a:
+        while x:
+            with x:
+                try:
+                    if x:
+                        pass
+                except ValueError:
+                    pass
+"""
+        code = "def f(a):\n" + branches + nested
+        ids = _rule_ids(code)
+        assert "pybp.func.cyclomatic_complexity" in ids
+        assert "pybp.control.deep_nesting" in ids
+        complexity_only = [r for r in PYBP_RULES if r.rule_id == "pybp.func.cyclomatic_complexity"]
+        assert [a.rule_id for a in run_pybp(code, complexity_only)] == ["pybp.func.cyclomatic_complexity"]
+
+class TestPybpLoopScope:
+    """Loop rules look only at statements the loop itself runs."""
+
+    def test_string_concat_in_nested_block_flagged(self):
+        code = """
+def f(items):
+    s = ""
+    for x in items:
+        if x:
+            s += x
+    return s
+"""
+        advisories = [a for a in run_pybp(code, PYBP_RULES) if a.rule_id == "pybp.perf.string_concat"]
+        assert [a.line for a in advisories] == [6]
+
+    def test_nested_function_body_is_not_part_of_loop(self):
+        code = """
+for x in items:
+    def g(acc):
+        acc += x
+        out.append(acc)
+"""
+        ids = _rule_ids(code)
+        assert "pybp.perf.string_concat" not in ids
+        assert "pybp.data.loop_append" not in ids
+
+    def test_loop_else_is_not_part_of_loop(self):
+        code = """
+for x in items:
+    print(x)
+else:
+    out.append(1)
+"""
+        assert "pybp.data.loop_append" not in _rule_ids(code)
+
+
+class TestPybpExceptHandlers:
+    """One fused handler check reports bare, swallowed and broad catches."""
+
+    def test_bare_except_reported_alone(self):
+        code = "try:\n    x = 1\nexcept:\n    pass\n"
+        ids = _rule_ids(code)
+        assert "pybp.error.bare_except" in ids
+        assert "pybp.error.swallow" not in ids
+
+    def test_broad_pass_reports_swallow_and_broad_catch(self):
+        code = "try:\n    x = 1\nexcept Exception:\n    pass\n"
+        advisories = [a for a in run_pybp(code, PYBP_RULES) if a.rule_id.startswith("pybp.error.")]
+        assert [(a.rule_id, a.severity) for a in advisories] == [
+            ("pybp.error.broad_catch", "advisory"),
+            ("pybp.error.swallow", "warning"),
+        ]
+
+    def test_swallow_only_rule_list(self):
+        code = "try:\n    x = 1\nexcept ValueError:\n    pass\nexcept:\n    pass\n"
+        swallow_only = [r for r in PYBP_RULES if r.rule_id == "pybp.error.swallow"]
+        assert [(a.rule_id, a.line) for a in run_pybp(code, swallow_only)] == [("pybp.error.swallow", 3)]
+
+    def test_swallow_and_broad_catch_without_bare_except(self):
+        code = "try:\n    x = 1\nexcept Exception:\n    pass\n"
+        subset = [r for r in PYBP_RULES if r.rule_id in ("pybp.error.swallow", "pybp.error.broad_catch")]
+        assert [a.rule_id for a in run_pybp(code, subset)] == ["pybp.error.broad_catch", "pybp.error.swallow"]
+
+    def test_rules_missing_from_the_run_are_not_reported(self):
+        code = "try:\n    x = 1\nexcept Exception:\n    pass\n"
+        bare_only = [r for r in PYBP_RULES if r.rule_id == "pybp.error.bare_except"]
+        assert run_pybp(code, bare_only) == []
+
+
+class TestPybpGlobalState:
+    """global statements anywhere in a function's own scope."""
+
+    def test_global_in_nested_block_flagged(self):
+        code = """
+def f(flag):
+    if flag:
+        global counter
+        counter = 1
+"""
+        assert "pybp.test.global_state" in _rule_ids(code)
+
+    def test_global_in_inner_function_belongs_to_inner_scope(self):
+        code = """
+def outer():
+    def inner():
+        global counter
+        counter = 1
+    return inner
+"""
+        advisories = [a for a in run_pybp(code, PYBP_RULES) if a.rule_id == "pybp.test.global_state"]
+        assert [a.function for a in advisories] == ["inner"]
+
+
+class TestPybpSeverityContract:
+    """Only info/advisory/warning advisories ever leave the engine."""
+
+    def test_rule_with_invalid_severity_is_skipped(self):
+        code = "try:\n    x = 1\nexcept:\n    pass\n"
+        bare = next(r for r in PYBP_RULES if r.rule_id == "pybp.error.bare_except")
+        assert run_pybp(code, [bare._replace(severity="error")]) == []
+        assert [a.rule_id for a in run_pybp(code, [bare])] == ["pybp.error.bare_except"]